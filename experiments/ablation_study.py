@@ -1,67 +1,59 @@
 """
-Ablation Study - Run all variants on the same set of conversations
+Ablation Study - Run all retrieval weight variants on the same conversations
 Generates Table 2 for the paper automatically.
+Usage: python experiments/ablation_study.py [--retrieval-only]
 """
 
+import os
+import sys
 import json
+import logging
+import argparse
 from pathlib import Path
-from tqdm import tqdm
-import pandas as pd
-
-from amn.agent import AMNAgent          # your existing package
-from amn.config import Config
-from experiments.eval_metrics import compute_all_metrics   # we'll create this next
+from datetime import datetime
 
 PROJECT_ROOT = Path(__file__).parent.parent
-RESULTS_DIR = PROJECT_ROOT / "results" / "ablation"
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from amn_data_package.scripts.load_data import AMNDataLoader
+from src.agent.agent import AMNAgent
+from src.memory.core import MemoryStore, WorkingMemory, EpisodicMemory
+from src.retrieval.engine import RetrievalEngine
+from src.agent.components import AgentComponents
+from src.agent.llm_cache import LLMResponseCache
+from src.agent.api_key_rotator import TokenBucket
+from src.agent.backends import get_backend
+
+RESULTS_DIR = PROJECT_ROOT / 'results' / 'ablation'
 RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+log_time = datetime.now().strftime('%Y%m%d_%H%M')
+logger = logging.getLogger('ABLATION')
 
-def run_ablation():
-    config = Config()                       # your config with dataset path
-    dataset = config.load_dataset()         # assume this returns list of 100 convos
 
-    variants = {
-        "Full AMN":          {"emotional_weight": 0.30, "peak_weight": 0.15},
-        "No Emotion":        {"emotional_weight": 0.00, "peak_weight": 0.15},
-        "No Peak Importance":{"emotional_weight": 0.30, "peak_weight": 0.00},
-        "Semantic Only":     {"emotional_weight": 0.00, "peak_weight": 0.00, "semantic_weight": 0.45},
-    }
+def setup_logging():
+    # Only when run as a script, so importing AblationAMNAgent leaves no log file
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s %(levelname)s %(message)s',
+        handlers=[
+            logging.FileHandler(RESULTS_DIR / f'ablation_{log_time}.log', encoding='utf-8'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
 
-    results = {}
+# Requests/min to the model server. Only calls that reach it are paced (cache
+# hits return at once), and each waits only for the part of the interval the
+# previous call did not already use up
+PACER = TokenBucket(float(os.environ.get('AMN_REQUESTS_PER_MIN', 60)), capacity=1)
 
-    for name, weights in tqdm(variants.items(), desc="Running ablations"):
-        # Override weights
-        agent = AMNAgent(weights=weights)
-        
-        conversation_results = []
-        for convo in dataset[:50]:          # 50 convos for speed (scale to 100 later)
-            history = []
-            for turn in convo["turns"]:
-                response = agent.respond(turn["user"], history)
-                history.append({"user": turn["user"], "agent": response})
-            
-            metrics = compute_all_metrics(history, ground_truth=convo["ground_truth"])
-            conversation_results.append(metrics)
-        
-        # Aggregate
-        df = pd.DataFrame(conversation_results)
-        results[name] = {
-            "memory_rate": df["memory_reference_rate"].mean() * 100,
-            "coherence": df["bertscore_f1"].mean(),
-            "std_memory": df["memory_reference_rate"].std() * 100,
-            "std_coherence": df["bertscore_f1"].std(),
-        }
-
-    # Save + print Table 2
-    pd.DataFrame(results).T.to_csv(RESULTS_DIR / "ablation_table.csv")
-    print("\n" + "="*60)
-    print("TABLE 2: ABLATION RESULTS")
-    print(pd.DataFrame(results).T.round(3))
-    print("="*60)
-    print(f"Results saved to {RESULTS_DIR}")
-
-if __name__ == "__main__":
-    run_ablation()
+# Every variant shares one appraiser / lexicon / LLM client;
+# AMN_LLM_CACHE=record|read-only|refresh replays unchanged prompts from disk
+COMPONENTS = AgentComponents(llm=PACER.pace(get_backend('gpt-oss').chat), llm_cache=LLMResponseCache.from_env())
+
+ABLATION_CONFIGS = {
+    'full': {
+        'semantic': 0.25,
         'emotional': 0.30,
         'goal': 0.20,
         'peak_end': 0.15,
@@ -99,15 +91,8 @@ if __name__ == "__main__":
 
 class AblationAMNAgent(AMNAgent):
     """AMN agent with configurable retrieval weights"""
-    def __init__(self, weights_config):
-        # Initialize components
-        self.wm = WorkingMemory()
-        self.em = EpisodicMemory()
-        self.retriever = RetrievalEngine(self.wm, self.em, k=3)
-        self.appraiser = EmotionalAppraisal()
-        
-        # Override weights
-        self.retriever.WEIGHTS = weights_config
+    def __init__(self, weights_config, components=COMPONENTS):
+        super().__init__(model="tinyllama", components=components, weights=weights_config)
         logger.info(f"Initialized with weights: {weights_config}")
 
 def run_ablation_variant(conversations, config_name, weights):
@@ -122,6 +107,7 @@ def run_ablation_variant(conversations, config_name, weights):
     
     for i, convo in enumerate(conversations):
         logger.info(f"[{i+1}/{len(conversations)}] {convo['primary_emotion']}")
+        agent.reset_session()
         turns = []
         
         for turn in convo.get('turns', []):
@@ -143,7 +129,6 @@ def run_ablation_variant(conversations, config_name, weights):
                         'error': str(e)
                     })
                 
-                time.sleep(1)  # Rate limiting
         
         results.append({
             'convo_id': convo.get('id', i),
@@ -153,7 +138,47 @@ def run_ablation_variant(conversations, config_name, weights):
     
     return results
 
+def compare_retrievals(conversations):
+    """
+    Retrieval-only ablation: replay each conversation's recorded turns into one
+    memory store and rank every config from a single component matrix per turn.
+    No LLM calls; reports top-k overlap of each variant with the full model.
+    """
+    appraiser = COMPONENTS.appraiser
+    results = []
+    for i, convo in enumerate(conversations):
+        store = MemoryStore()
+        wm, em = WorkingMemory(store=store, appraiser=appraiser), EpisodicMemory(store=store)
+        retriever = RetrievalEngine(wm, em, k=3)
+        turns = []
+        for turn in convo.get('turns', []):
+            text = turn.get('text', '')
+            if turn.get('speaker') == 'user':
+                vad = appraiser.analyze(text)['vad']
+                ranked = retriever.retrieve_multi(text, vad, ABLATION_CONFIGS)
+                ids = {name: [m.id for m, _ in top] for name, top in ranked.items()}
+                turns.append({
+                    'user': text,
+                    'overlap_with_full': {
+                        name: len(set(v) & set(ids['full'])) / max(len(ids['full']), 1)
+                        for name, v in ids.items()
+                    }
+                })
+            em.add(wm.add(f"{turn.get('speaker', 'user').capitalize()}: {text}"))
+        results.append({
+            'convo_id': convo.get('id', i),
+            'primary_emotion': convo.get('primary_emotion', 'unknown'),
+            'turns': turns
+        })
+    return results
+
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--retrieval-only', action='store_true',
+                        help='Compare retrieved memories across configs without LLM calls')
+    args = parser.parse_args()
+    setup_logging()
+
     logger.info("="*60)
     logger.info("AMN ABLATION STUDY")
     logger.info("="*60)
@@ -175,6 +200,13 @@ def main():
     
     logger.info(f"\n✓ Selected {len(test_convos)} test conversations")
     logger.info(f"✓ Emotions: {sorted(emotions_seen)}\n")
+
+    if args.retrieval_only:
+        output_file = RESULTS_DIR / f'ablation_retrieval_{log_time}.json'
+        with open(output_file, 'w') as f:
+            json.dump({'configs': ABLATION_CONFIGS, 'results': compare_retrievals(test_convos)}, f, indent=2)
+        logger.info(f"✅ Retrieval-only ablation: {output_file}")
+        return
     
     # Run each ablation variant
     all_results = {}
@@ -0,0 +1,130 @@
+"""
+End-to-end load test of the AMN agent stack against the local mock Ollama
+server: no network, GPU or model needed. Runs --convos conversations of
+--turns turns, --concurrency at a time, and reports turn throughput and
+p50/p95/p99 turn latency (plus TTFT in stream mode).
+Usage: python experiments/bench_agents.py --mode async --convos 32 --concurrency 16 --latency_ms 300 --error_rate 0.02
+"""
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from experiments.exp1_generator import generate_career_crisis_turns
+from src.agent.agent import AMNAgent
+from src.agent.backends import OllamaBackend
+from src.agent.components import AgentComponents
+from src.agent.http_client import AsyncPooledHTTPClient, PooledHTTPClient
+from src.agent.mock_server import LATENCIES, MockOllamaServer
+
+
+def run_sync(components, convos, turns, concurrency, stream=False):
+    latency_ms, ttft_ms, failures = [], [], 0
+
+    def converse(_):
+        nonlocal failures
+        agent = AMNAgent(model='mock', components=components)
+        for text in turns:
+            start = time.perf_counter()
+            try:
+                if stream:
+                    for _ in agent.stream_step(text):
+                        pass
+                    if 'ttft_ms' in agent.last_stream_stats:
+                        ttft_ms.append(agent.last_stream_stats['ttft_ms'])
+                else:
+                    agent.step(text)
+            except Exception as e:
+                failures += 1
+                print(f"[WARN] turn failed: {e}")
+                continue
+            latency_ms.append((time.perf_counter() - start) * 1000)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(converse, range(convos)))
+    return latency_ms, ttft_ms, failures
+
+
+async def run_async(components, convos, turns, concurrency):
+    latency_ms, failures = [], 0
+    slots = asyncio.Semaphore(concurrency)
+
+    async def converse():
+        nonlocal failures
+        async with slots:
+            agent = AMNAgent(model='mock', components=components)
+            for text in turns:
+                start = time.perf_counter()
+                try:
+                    await agent.astep(text)
+                except Exception as e:
+                    failures += 1
+                    print(f"[WARN] turn failed: {e}")
+                    continue
+                latency_ms.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(converse() for _ in range(convos)))
+    return latency_ms, [], failures
+
+
+def percentiles(values, prefix):
+    if not values:
+        return {}
+    return {f'{prefix}_p{p}': float(np.percentile(values, p)) for p in (50, 95, 99)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', choices=['sync', 'stream', 'async'], default='sync')
+    parser.add_argument('--convos', type=int, default=16)
+    parser.add_argument('--turns', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', choices=LATENCIES, default='lognormal')
+    parser.add_argument('--latency_ms', type=float, default=200.0)
+    parser.add_argument('--latency_sigma', type=float, default=0.5)
+    parser.add_argument('--tokens_per_s', type=float, default=50.0)
+    parser.add_argument('--reply_tokens', type=int, default=40)
+    parser.add_argument('--error_rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='Write the report as JSON here')
+    args = parser.parse_args()
+
+    server = MockOllamaServer(latency=args.latency, latency_ms=args.latency_ms, latency_sigma=args.latency_sigma,
+                              tokens_per_s=args.tokens_per_s, reply_tokens=args.reply_tokens,
+                              error_rate=args.error_rate, seed=args.seed).start()
+    client = PooledHTTPClient(pool_size=args.concurrency)
+    async_client = AsyncPooledHTTPClient(pool_size=args.concurrency)
+    backend = OllamaBackend(url=server.url, default_model='mock', name='mock',
+                            client=client, async_client=async_client)
+    components = AgentComponents(backend=backend)
+    turns = generate_career_crisis_turns(args.turns)
+
+    start = time.perf_counter()
+    try:
+        if args.mode == 'async':
+            latency_ms, ttft_ms, failures = asyncio.run(run_async(components, args.convos, turns, args.concurrency))
+        else:
+            latency_ms, ttft_ms, failures = run_sync(components, args.convos, turns, args.concurrency,
+                                                     stream=args.mode == 'stream')
+    finally:
+        elapsed = time.perf_counter() - start
+        server.stop()
+
+    report = {'mode': args.mode, 'convos': args.convos, 'turns': len(latency_ms), 'failed_turns': failures,
+              'concurrency': args.concurrency, 'elapsed_s': elapsed,
+              'turns_per_s': len(latency_ms) / elapsed if elapsed else 0.0}
+    report.update(percentiles(latency_ms, 'turn_ms'))
+    report.update(percentiles(ttft_ms, 'ttft_ms'))
+    report['http_retries'] = client.retries + async_client.retries
+    report.update(server.metrics())
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
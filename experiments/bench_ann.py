@@ -0,0 +1,71 @@
+"""
+HNSW vs brute-force benchmark for memory embedding search (CPU only).
+Usage: python experiments/bench_ann.py --n 20000 --dim 384
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.retrieval.ann import HNSWIndex
+
+
+def make_data(n, dim, n_queries, seed=0):
+    # Clustered vectors resemble sentence embeddings better than isotropic noise
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(n // 100, 1), dim))
+    data = centers[rng.integers(len(centers), size=n)] + 0.3 * rng.normal(size=(n, dim))
+    queries = centers[rng.integers(len(centers), size=n_queries)] + 0.3 * rng.normal(size=(n_queries, dim))
+    return data.astype(np.float32), queries.astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n', type=int, default=20000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--M', type=int, default=16)
+    parser.add_argument('--ef_construction', type=int, default=100)
+    parser.add_argument('--ef', type=int, nargs='+', default=[16, 32, 64, 128, 256])
+    args = parser.parse_args()
+
+    data, queries = make_data(args.n, args.dim, args.queries)
+    index = HNSWIndex(args.dim, M=args.M, ef_construction=args.ef_construction)
+    t0 = time.perf_counter()
+    for i, vec in enumerate(data):
+        index.add(i, vec)
+    build_s = time.perf_counter() - t0
+    print(f"Build: {args.n} vectors in {build_s:.1f}s ({args.n / build_s:.0f} inserts/s)")
+
+    t0 = time.perf_counter()
+    truth = [{key for key, _ in index.exact_search(q, args.k)} for q in queries]
+    brute_ms = (time.perf_counter() - t0) * 1000 / args.queries
+    print(f"Brute force: {brute_ms:.2f} ms/query")
+
+    print(f"{'ef':>6} {'recall@' + str(args.k):>10} {'ms/query':>10} {'speedup':>8}")
+    for ef in args.ef:
+        t0 = time.perf_counter()
+        found = [{key for key, _ in index.search(q, args.k, ef=ef)} for q in queries]
+        ms = (time.perf_counter() - t0) * 1000 / args.queries
+        recall = np.mean([len(f & t) / args.k for f, t in zip(found, truth)])
+        print(f"{ef:>6} {recall:>10.3f} {ms:>10.2f} {brute_ms / ms:>7.1f}x")
+
+    # Deletion + persistence round trip
+    for key in range(0, args.n, 10):
+        index.remove(key)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'hnsw.pkl')
+        index.save(path)
+        restored = HNSWIndex.load(path)
+    hits = restored.search(queries[0], args.k)
+    assert all(key % 10 != 0 for key, _ in hits), "deleted keys returned"
+    print(f"Save/load OK: {len(restored)} live vectors after deleting {args.n // 10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,12 +7,15 @@ from src.agent.agent import AMNAgent
 from src.agent.baseline import BaselineAgent
 from src.agent.recency import RecencyAgent
 from src.agent.rag import SemanticRAGAgent
+from src.agent.components import AgentComponents
+from src.agent.replay import ReplayLLM
 
+COMPONENTS = AgentComponents()
 AGENTS = {
-    'amn': AMNAgent(model="gpt-oss:120b-cloud"),
-    'baseline': BaselineAgent(model="gpt-oss:120b-cloud"),
-    'recency': RecencyAgent(model="gpt-oss:120b-cloud"),
-    'semantic_rag': SemanticRAGAgent(model="gpt-oss:120b-cloud")
+    'amn': AMNAgent(model="gpt-oss:120b-cloud", components=COMPONENTS),
+    'baseline': BaselineAgent(model="gpt-oss:120b-cloud", components=COMPONENTS),
+    'recency': RecencyAgent(model="gpt-oss:120b-cloud", components=COMPONENTS),
+    'semantic_rag': SemanticRAGAgent(model="gpt-oss:120b-cloud", components=COMPONENTS)
 }
 
 TOPICS = [
@@ -35,7 +38,8 @@ def generate_career_crisis_turns(n=50):
 
 
 
-def run_experiment1(full=True, model="gpt-oss:120b-cloud", n_convos=100, output=None):
+def run_experiment1(full=True, model="gpt-oss:120b-cloud", n_convos=100, output=None, llm_cache=None,
+                    backend='gpt-oss'):
     import os
     os.environ["TOKENIZERS_PARALLELISM"] = "false"   # avoids warnings
     # Reduce default number of conversations to 10 for lower memory usage
@@ -44,11 +48,17 @@ def run_experiment1(full=True, model="gpt-oss:120b-cloud", n_convos=100, output=
         n_convos = 10
     from experiments.eval_metrics import compute_all_metrics
     # Dynamically create agents with the specified model
+    if llm_cache is None and backend == 'gpt-oss':
+        components = COMPONENTS
+    else:
+        components = AgentComponents(llm_cache=llm_cache, backend=backend)
+    # A replayed run serves each (conversation, condition) from its recording
+    replay = components.backend if isinstance(components.backend, ReplayLLM) else None
     AGENTS = {
-        'amn': AMNAgent(model=model),
-        'baseline': BaselineAgent(model=model),
-        'recency': RecencyAgent(model=model),
-        'semantic_rag': SemanticRAGAgent(model=model)
+        'amn': AMNAgent(model=model, components=components),
+        'baseline': BaselineAgent(model=model, components=components),
+        'recency': RecencyAgent(model=model, components=components),
+        'semantic_rag': SemanticRAGAgent(model=model, components=components)
     }
     # Use more topics if full, else default to 30
     if full:
@@ -65,13 +75,18 @@ def run_experiment1(full=True, model="gpt-oss:120b-cloud", n_convos=100, output=
         convo_metrics = {}
         for condition, agent in AGENTS.items():
             print(f"  Running {condition}...")
+            if replay is not None:
+                replay.start(i + 1, condition)
+            if isinstance(agent, AMNAgent):
+                agent.reset_session()
             convo = []
             for turn, user_input in enumerate(user_turns, 1):
                 if turn > 50: break
                 response = agent.step(user_input)
                 convo.append({
                     "turn": turn, "user": user_input, 
-                    "agent": response, "condition": condition
+                    "agent": response, "condition": condition,
+                    "prompt": components.last_prompt
                 })
             convo_results[condition] = convo
             # Compute metrics for this condition
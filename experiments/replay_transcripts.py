@@ -0,0 +1,89 @@
+"""
+Re-run the full agent pipeline (appraisal, memory, retrieval, prompt
+building) over recorded Experiment 1 or ablation traffic, with the LLM
+replaced by the recorded replies. No model server needed; reports
+per-condition step latency, retrieval stage latencies and any prompt
+divergences from the recording.
+Usage: python experiments/replay_transcripts.py [--transcripts results/exp1_repro.json] [--strict]
+       python experiments/replay_transcripts.py --transcripts results/ablation/ablation_results_<stamp>.json
+"""
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import json
+import time
+from functools import partial
+import numpy as np
+from src.agent.agent import AMNAgent
+from src.agent.baseline import BaselineAgent
+from src.agent.recency import RecencyAgent
+from src.agent.rag import SemanticRAGAgent
+from src.agent.components import AgentComponents
+from src.agent.replay import ReplayLLM
+
+AGENT_CLASSES = {
+    'amn': AMNAgent,
+    'baseline': BaselineAgent,
+    'recency': RecencyAgent,
+    'semantic_rag': SemanticRAGAgent
+}
+
+
+def agent_classes(path):
+    """
+    Condition -> agent factory: the Experiment 1 conditions, plus one
+    AblationAMNAgent per weight config when the file is ablation results.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    classes = dict(AGENT_CLASSES)
+    configs = data.get('configs') if isinstance(data, dict) else None
+    if configs:
+        from experiments.ablation_study import AblationAMNAgent
+        for name, weights in configs.items():
+            classes[name] = partial(AblationAMNAgent, weights)
+    return classes
+
+
+def replay(path, strict=False):
+    llm = ReplayLLM.from_file(path, strict=strict)
+    components = AgentComponents(backend=llm)
+    classes = agent_classes(path)
+    # One agent per condition across all conversations, as in the recorded run
+    agents, latency_ms = {}, {}
+    for convo_id, condition in llm.sessions:
+        if condition not in classes:
+            print(f"[WARN] skipping unknown condition {condition!r}")
+            continue
+        agent = agents.get(condition)
+        if agent is None:
+            agent = agents[condition] = classes[condition](components=components)
+        if isinstance(agent, AMNAgent):
+            agent.reset_session()
+        llm.start(convo_id, condition)
+        for turn in llm.turns(convo_id, condition):
+            start = time.perf_counter()
+            agent.step(turn['user'])
+            latency_ms.setdefault(condition, []).append((time.perf_counter() - start) * 1000)
+    report = {
+        'replay': llm.report(),
+        'step_ms_mean': {c: float(np.mean(v)) for c, v in latency_ms.items()},
+        'step_ms_p95': {c: float(np.percentile(v, 95)) for c, v in latency_ms.items()},
+    }
+    if 'amn' in agents:
+        report['amn_retrieval'] = agents['amn'].retriever.metrics()
+    report['divergences'] = [d._asdict() for d in llm.divergences[:50]]
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--transcripts', default='results/exp1_repro.json')
+    parser.add_argument('--strict', action='store_true', help='Stop at the first divergence')
+    parser.add_argument('--output', default=None, help='Write the report as JSON here')
+    args = parser.parse_args()
+    report = replay(args.transcripts, strict=args.strict)
+    print(json.dumps({k: v for k, v in report.items() if k != 'divergences'}, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
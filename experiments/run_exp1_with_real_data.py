@@ -31,10 +31,13 @@ from src.agent.agent import AMNAgent
 from src.agent.baseline import BaselineAgent
 from src.agent.recency import RecencyAgent
 from src.agent.rag import SemanticRAGAgent
+from src.agent.components import AgentComponents
+from src.agent.llm_cache import LLMResponseCache
+from src.agent.api_key_rotator import TokenBucket
+from src.agent.backends import get_backend
 
 
 # Load up to 100 conversations from the data package
-import time
 from pathlib import Path
 loader = AMNDataLoader(os.path.join(PROJECT_ROOT, 'amn_data_package'))
 conversations = loader.prepare_for_experiment(n_conversations=100)
@@ -50,11 +53,19 @@ else:
     results = []
     start_idx = 0
 
+# Requests/min to the model server. Only calls that reach it are paced (cache
+# hits return at once), and each waits only for the part of the interval the
+# previous call did not already use up
+PACER = TokenBucket(float(os.environ.get('AMN_REQUESTS_PER_MIN', 30)), capacity=1)
+
+# One appraiser / lexicon / LLM client shared by all four conditions;
+# AMN_LLM_CACHE=record|read-only|refresh replays unchanged prompts from disk
+COMPONENTS = AgentComponents(llm=PACER.pace(get_backend('gpt-oss').chat), llm_cache=LLMResponseCache.from_env())
 AGENTS = {
-    'amn': AMNAgent(),
-    'baseline': BaselineAgent(),
-    'recency': RecencyAgent(),
-    'semantic_rag': SemanticRAGAgent()
+    'amn': AMNAgent(components=COMPONENTS),
+    'baseline': BaselineAgent(components=COMPONENTS),
+    'recency': RecencyAgent(components=COMPONENTS),
+    'semantic_rag': SemanticRAGAgent(components=COMPONENTS)
 }
 
 
@@ -65,6 +76,8 @@ try:
         convo_results = {}
         for condition, agent in AGENTS.items():
             logger.info(f"  Running {condition}...")
+            if isinstance(agent, AMNAgent):
+                agent.reset_session()
             turns = []
             for turn in convo['turns']:
                 if turn['speaker'] == 'user':
@@ -74,7 +87,8 @@ try:
                         turns.append({
                             'user': user_input,
                             'agent': response,
-                            'condition': condition
+                            'condition': condition,
+                            'prompt': COMPONENTS.last_prompt
                         })
                         logger.info(f"    User: {user_input}")
                         logger.info(f"    Agent: {response}")
@@ -92,7 +106,6 @@ try:
                             with open(RESUME_FILE, 'w', encoding='utf-8') as f:
                                 json.dump(results, f, indent=2)
                             sys.exit(99)
-                    time.sleep(2)  # Delay between API calls
             convo_results[condition] = turns
         results.append({
             'convo_id': i+1,
@@ -7,6 +7,8 @@ Usage: python run_experiments.py --output results/exp1_repro.json
 import argparse
 from experiments.exp1_generator import run_experiment1
 from experiments.eval_metrics import compute_all_metrics
+from src.agent.backends import available_backends
+from src.agent.llm_cache import LLMResponseCache
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -14,6 +16,13 @@ if __name__ == "__main__":
     parser.add_argument('--full', action='store_true', help='Run full experiment (default: True)')
     parser.add_argument('--model', type=str, default='tinyllama:latest', help='Model name for agents')
     parser.add_argument('--n_convos', type=int, default=100, help='Number of conversations to run')
+    parser.add_argument('--llm-cache', choices=['off', 'record', 'read-only', 'refresh'], default='off',
+                        help='On-disk LLM response cache mode (reruns with unchanged prompts skip the model)')
+    parser.add_argument('--llm-cache-path', default='results/cache/llm_responses.sqlite')
+    parser.add_argument('--backend', choices=available_backends(), default='gpt-oss',
+                        help="LLM backend ('mock' starts a local Ollama stand-in, no network needed)")
     args = parser.parse_args()
-    run_experiment1(full=args.full, model=args.model, n_convos=args.n_convos, output=args.output)
+    llm_cache = None if args.llm_cache == 'off' else LLMResponseCache(args.llm_cache_path, args.llm_cache)
+    run_experiment1(full=args.full, model=args.model, n_convos=args.n_convos, output=args.output,
+                    llm_cache=llm_cache, backend=args.backend)
     print(f"Repro complete: {args.output}")
@@ -1,22 +1,38 @@
 
+import asyncio
 import logging
-from typing import List
-from src.memory.core import WorkingMemory, EpisodicMemory
-from src.retrieval.engine import RetrievalEngine
-from src.emotion.analyzer import EmotionalAppraisal
-
-from src.agent.gpt_oss_client import gpt_oss_cloud_chat
+from typing import Dict, Iterator, List, Optional
+from src.memory.core import MemoryStore, WorkingMemory, EpisodicMemory
+from src.retrieval.engine import RetrievalEngine, RetrievalRequest
+from src.emotion.analyzer import lazarus_from_vad
+from src.emotion.mood import MoodTracker
+from src.agent.components import AgentComponents
 
 logger = logging.getLogger('AMN')
 
 class AMNAgent:
-    def __init__(self, model="tinyllama"):
-        self.wm = WorkingMemory()
-        self.em = EpisodicMemory()
-        self.retriever = RetrievalEngine(self.wm, self.em, k=3)
-        self.appraiser = EmotionalAppraisal()
+    def __init__(self, model="tinyllama", components: Optional[AgentComponents] = None,
+                 weights: Optional[Dict[str, float]] = None, mood_weight: float = 0.0):
+        self.components = components or AgentComponents()
+        self.store = MemoryStore()
+        self.wm = WorkingMemory(store=self.store, appraiser=self.components.turn_appraiser())
+        self.em = EpisodicMemory(store=self.store)
+        # mood_weight > 0 lets retrieval follow the session mood, not just this turn.
+        # No result cache: every step writes a memory, so a query never
+        # recurs at the same store version
+        self.retriever = RetrievalEngine(self.wm, self.em, k=3, weights=weights, cache_size=0,
+                                         mood_weight=mood_weight)
+        self.appraiser = self.components.appraiser
+        self.mood = MoodTracker()
+        self.last_stream_stats = {}
+        # astep() calls on one agent run one at a time: its memory is not shared-safe
+        self._turn_lock = asyncio.Lock()
         self.model = model
 
+    def reset_session(self):
+        """Start a new conversation: memories persist, the session mood does not."""
+        self.mood.reset()
+
     def _format_context(self, retrieved: List) -> str:
         ctx = []
         for mem, score in retrieved:
@@ -27,21 +43,74 @@ class AMNAgent:
             ctx.append(f"PAST: {mem.content[:150]}... [VAD:{vad_str}] (score:{score:.2f})")
         return "\n".join(ctx)
 
-    def step(self, user_input: str) -> str:
+    SYSTEM_PROMPT = "You maintain emotional continuity across conversations."
+
+    def _prepare(self, user_input: str):
         vad = self.appraiser.analyze(user_input)['vad']
         logger.info(f"User VAD: {vad}")
-        retrieved = self.retriever.retrieve(user_input, vad)
+        prior_mood = self.mood.state
+        mood = self.mood.update(vad)
+        request = RetrievalRequest(user_input, vad, appraisal=lazarus_from_vad(vad), mood=mood)
+        retrieved = self.retriever.retrieve(request)
         context = self._format_context(retrieved)
         prompt = f"You are an emotionally aware agent. Use these memories to respond empathetically:\n\nMEMORIES:\n{context}\n\nCURRENT: {user_input}\n\nRespond naturally, referencing relevant past emotions/experiences when helpful. Be concise."
-        reply = gpt_oss_cloud_chat(
+        return prompt, prior_mood
+
+    def _remember(self, user_input: str, reply: str, prior_mood):
+        full_turn = f"User: {user_input}\nAgent: {reply}"
+        entry = self.wm.add(full_turn)
+        # Log-only for now: the salience verdict does not change what is stored
+        self.em.consolidate(self.em.add(entry), prior_mood)
+        logger.info(f"Response: {reply[:50]}...")
+
+    def step(self, user_input: str) -> str:
+        prompt, prior_mood = self._prepare(user_input)
+        reply = self.components.chat(
             prompt,
             model=self.model,
-            system_prompt="You maintain emotional continuity across conversations.",
+            system_prompt=self.SYSTEM_PROMPT,
             max_tokens=200,
             temperature=0.7
         )
-        full_turn = f"User: {user_input}\nAgent: {reply}"
-        entry = self.wm.add(full_turn)
-        self.em.add(entry)
-        logger.info(f"Response: {reply[:50]}...")
+        self._remember(user_input, reply, prior_mood)
         return reply
+
+    async def astep(self, user_input: str) -> str:
+        """
+        Non-blocking step(): appraisal and retrieval run on the components'
+        executor and the LLM call is awaited, so one event loop can keep many
+        agents (conversations) in flight. Turns of one agent stay ordered.
+        """
+        async with self._turn_lock:
+            prompt, prior_mood = await self.components.run_blocking(self._prepare, user_input)
+            reply = await self.components.achat(
+                prompt,
+                model=self.model,
+                system_prompt=self.SYSTEM_PROMPT,
+                max_tokens=200,
+                temperature=0.7
+            )
+            await self.components.run_blocking(self._remember, user_input, reply, prior_mood)
+            return reply
+
+    def stream_step(self, user_input: str) -> Iterator[str]:
+        """
+        step() that yields reply chunks as they arrive. The turn is written to
+        memory only once the stream completes: a stream that fails partway, or
+        that the caller closes early, stores nothing (as a failed step()).
+        Per-turn ttft_ms / tokens_per_s are kept in self.last_stream_stats.
+        """
+        prompt, prior_mood = self._prepare(user_input)
+        self.last_stream_stats = {}
+        chunks = []
+        for chunk in self.components.chat_stream(
+            prompt,
+            stats=self.last_stream_stats,
+            model=self.model,
+            system_prompt=self.SYSTEM_PROMPT,
+            max_tokens=200,
+            temperature=0.7
+        ):
+            chunks.append(chunk)
+            yield chunk
+        self._remember(user_input, ''.join(chunks).strip(), prior_mood)
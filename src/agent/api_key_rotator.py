@@ -1,13 +1,189 @@
+import asyncio
+import functools
 import os
+import threading
+import time
+from collections import Counter
 from itertools import cycle
-from dotenv import load_dotenv
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
 
-# Load .env file if present
-load_dotenv()
+try:
+    from dotenv import load_dotenv
+    # Load .env file if present
+    load_dotenv()
+except ImportError:
+    pass
 
-def get_api_key_rotator(env_var_name):
+logger = logging.getLogger('AMN')
+
+
+def load_api_keys(env_var_name) -> List[str]:
     keys = os.getenv(env_var_name, "").split(",")
     keys = [k.strip() for k in keys if k.strip()]
     if not keys:
         raise RuntimeError(f"No API keys found for {env_var_name}")
-    return cycle(keys)
+    return keys
+
+
+def get_api_key_rotator(env_var_name):
+    return cycle(load_api_keys(env_var_name))
+
+
+class TokenBucket:
+    """
+    Budget refilled continuously at rate_per_min, holding at most `capacity`
+    (default: one minute's worth). take() may drive the level negative, so a
+    request larger than the estimate is paid back before the next one.
+    Not locked; KeyScheduler serialises access.
+    """
+
+    def __init__(self, rate_per_min: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_min / 60
+        self.capacity = rate_per_min if capacity is None else capacity
+        self.level = self.capacity
+        self.clock = clock
+        self._stamp = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def delay(self, n: float = 1.0) -> float:
+        """Seconds until n units are available (a request above capacity waits for a full bucket)."""
+        self._refill()
+        return max(0.0, (min(n, self.capacity) - self.level) / self.rate)
+
+    def take(self, n: float = 1.0):
+        self._refill()
+        self.level -= n
+
+    def give(self, n: float):
+        self._refill()
+        self.level = min(self.capacity, self.level + n)
+
+    def wait(self, n: float = 1.0):
+        """Block until n units are available, then take them."""
+        time.sleep(self.delay(n))
+        self.take(n)
+
+    def pace(self, fn: Callable) -> Callable:
+        """fn that waits for one unit before every call (same signature, for cache keys)."""
+        @functools.wraps(fn)
+        def paced(*args, **kwargs):
+            self.wait()
+            return fn(*args, **kwargs)
+        return paced
+
+
+class KeyScheduler:
+    """
+    Hands out API keys so each stays under its requests/min and tokens/min
+    limits: every key has one token bucket per limit, and acquire() returns
+    the key that can serve the request soonest (most request headroom on a
+    tie), sleeping only when none can. Aggregate throughput is therefore the
+    sum of the per-key limits.
+
+    Callers pass an estimate of the request's tokens to acquire() and the
+    actual usage to settle(). A key that hits a quota or rate-limit error is
+    quarantined (for the server's retry-after, else quarantine_s) and skipped
+    until then.
+    """
+
+    def __init__(self, keys: Iterable[str], requests_per_min: float = 50, tokens_per_min: Optional[float] = 40000,
+                 quarantine_s: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.keys = list(keys)
+        if not self.keys:
+            raise RuntimeError("KeyScheduler needs at least one API key")
+        self.quarantine_s = quarantine_s
+        self.clock = clock
+        self._requests = {k: TokenBucket(requests_per_min, clock=clock) for k in self.keys}
+        self._tokens = {k: TokenBucket(tokens_per_min, clock=clock) for k in self.keys} if tokens_per_min else {}
+        self._quarantined_until = {k: 0.0 for k in self.keys}
+        self._lock = threading.Lock()
+        self.granted: Counter = Counter()
+        self.quarantines: Counter = Counter()
+        self.wait_s = 0.0
+
+    @classmethod
+    def from_env(cls, env_var_name: str = 'ANTHROPIC_API_KEYS', **kwargs) -> 'KeyScheduler':
+        """
+        Keys from a comma-separated env var (falling back to ANTHROPIC_API_KEY);
+        limits from ANTHROPIC_RPM / ANTHROPIC_TPM unless given.
+        """
+        try:
+            keys = load_api_keys(env_var_name)
+        except RuntimeError:
+            keys = load_api_keys('ANTHROPIC_API_KEY')
+        kwargs.setdefault('requests_per_min', float(os.getenv('ANTHROPIC_RPM', 50)))
+        kwargs.setdefault('tokens_per_min', float(os.getenv('ANTHROPIC_TPM', 40000)))
+        return cls(keys, **kwargs)
+
+    def _delay(self, key: str, tokens: float) -> float:
+        delay = self._quarantined_until[key] - self.clock()
+        if delay > 0:
+            return delay
+        delay = self._requests[key].delay(1)
+        if self._tokens:
+            delay = max(delay, self._tokens[key].delay(tokens))
+        return delay
+
+    def _reserve(self, tokens: float) -> Tuple[Optional[str], float]:
+        """(key, 0) with its budget taken, or (None, seconds until some key could serve)."""
+        with self._lock:
+            delay, _, _, key = min((self._delay(k, tokens), -self._requests[k].level, i, k)
+                                   for i, k in enumerate(self.keys))
+            if delay > 0:
+                return None, delay
+            self._requests[key].take(1)
+            if self._tokens:
+                self._tokens[key].take(tokens)
+            self.granted[key] += 1
+            return key, 0.0
+
+    def acquire(self, tokens: float = 0) -> str:
+        while True:
+            key, delay = self._reserve(tokens)
+            if key is not None:
+                return key
+            self.wait_s += delay
+            time.sleep(delay)
+
+    async def aacquire(self, tokens: float = 0) -> str:
+        while True:
+            key, delay = self._reserve(tokens)
+            if key is not None:
+                return key
+            self.wait_s += delay
+            await asyncio.sleep(delay)
+
+    def settle(self, key: str, estimated: float, actual: float):
+        """Correct the key's token budget once the request's real usage is known."""
+        if self._tokens:
+            with self._lock:
+                if actual > estimated:
+                    self._tokens[key].take(actual - estimated)
+                else:
+                    self._tokens[key].give(estimated - actual)
+
+    def quarantine(self, key: str, seconds: Optional[float] = None):
+        seconds = self.quarantine_s if seconds is None else seconds
+        with self._lock:
+            self._quarantined_until[key] = self.clock() + seconds
+            self.quarantines[key] += 1
+        logger.warning(f"API key ...{key[-4:]} quarantined for {seconds:.0f}s")
+
+    def available(self) -> int:
+        now = self.clock()
+        return sum(until <= now for until in self._quarantined_until.values())
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            'keys': len(self.keys),
+            'keys_available': self.available(),
+            'requests_granted': sum(self.granted.values()),
+            'key_quarantines': sum(self.quarantines.values()),
+            'scheduler_wait_s': self.wait_s,
+        }
@@ -0,0 +1,168 @@
+import asyncio
+import os
+from typing import Callable, Dict, Iterator, Optional, Union
+from src.agent.http_client import AsyncPooledHTTPClient, PooledHTTPClient, get_async_client, get_client
+
+OLLAMA_URL = "http://localhost:11434/api/chat"
+
+
+def chat_payload(prompt, model, system_prompt, max_tokens, temperature, stream) -> Dict:
+    """Body of an Ollama /api/chat request."""
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+    return {
+        "model": model,
+        "messages": messages,
+        "stream": stream,
+        "options": {
+            "temperature": temperature,
+            "num_predict": max_tokens
+        }
+    }
+
+
+class LLMBackend:
+    """
+    One chat backend behind a single interface: chat() blocks, stream()
+    yields text chunks, achat() is awaitable. Backends that cannot stream or
+    await natively fall back to one chunk / a worker thread.
+    """
+    name = 'base'
+    default_model: Optional[str] = None
+
+    def chat(self, prompt: str, model: Optional[str] = None, system_prompt: Optional[str] = None,
+             max_tokens: int = 200, temperature: float = 0.7) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, model: Optional[str] = None, system_prompt: Optional[str] = None,
+               max_tokens: int = 200, temperature: float = 0.7) -> Iterator[str]:
+        yield self.chat(prompt, model, system_prompt, max_tokens, temperature)
+
+    async def achat(self, prompt: str, model: Optional[str] = None, system_prompt: Optional[str] = None,
+                    max_tokens: int = 200, temperature: float = 0.7) -> str:
+        return await asyncio.to_thread(self.chat, prompt, model, system_prompt, max_tokens, temperature)
+
+
+_REGISTRY: Dict[str, Callable[..., LLMBackend]] = {}
+
+
+def register_backend(name: str):
+    """Class/factory decorator: make a backend available to get_backend(name)."""
+    def register(factory):
+        _REGISTRY[name] = factory
+        return factory
+    return register
+
+
+def get_backend(backend: Union[str, LLMBackend], **kwargs) -> LLMBackend:
+    if isinstance(backend, LLMBackend):
+        return backend
+    factory = _REGISTRY.get(backend)
+    if factory is None:
+        raise ValueError(f"Unknown LLM backend: {backend} (registered: {sorted(_REGISTRY)})")
+    return factory(**kwargs)
+
+
+def available_backends():
+    return sorted(_REGISTRY)
+
+
+@register_backend('ollama')
+class OllamaBackend(LLMBackend):
+    """
+    Ollama /api/chat protocol over the pooled sync and async HTTP clients.
+    The URL is fixed, or read from url_env on every call (falling back to
+    the local Ollama server).
+    """
+    name = 'ollama'
+
+    def __init__(self, url: Optional[str] = None, default_model: str = 'tinyllama',
+                 url_env: Optional[str] = None, name: Optional[str] = None,
+                 client: Optional[PooledHTTPClient] = None,
+                 async_client: Optional[AsyncPooledHTTPClient] = None):
+        self._url = url
+        self.url_env = url_env
+        self.default_model = default_model
+        self.name = name or self.name
+        self.client = client
+        self.async_client = async_client
+
+    @property
+    def url(self) -> str:
+        if self._url:
+            return self._url
+        return os.environ.get(self.url_env, OLLAMA_URL) if self.url_env else OLLAMA_URL
+
+    def _payload(self, prompt, model, system_prompt, max_tokens, temperature, stream):
+        return chat_payload(prompt, model or self.default_model, system_prompt, max_tokens, temperature, stream)
+
+    def chat(self, prompt, model=None, system_prompt=None, max_tokens=200, temperature=0.7):
+        payload = self._payload(prompt, model, system_prompt, max_tokens, temperature, stream=False)
+        data = (self.client or get_client()).post_json(self.url, payload)
+        return data["message"]["content"].strip()
+
+    def stream(self, prompt, model=None, system_prompt=None, max_tokens=200, temperature=0.7):
+        payload = self._payload(prompt, model, system_prompt, max_tokens, temperature, stream=True)
+        for data in (self.client or get_client()).post_stream(self.url, payload):
+            chunk = data.get("message", {}).get("content", "")
+            if chunk:
+                yield chunk
+            if data.get("done"):
+                break
+
+    async def achat(self, prompt, model=None, system_prompt=None, max_tokens=200, temperature=0.7):
+        payload = self._payload(prompt, model, system_prompt, max_tokens, temperature, stream=False)
+        data = await (self.async_client or get_async_client()).post_json(self.url, payload)
+        return data["message"]["content"].strip()
+
+
+@register_backend('gpt-oss')
+def gpt_oss_backend(**kwargs) -> OllamaBackend:
+    """Ollama-protocol endpoint from GPT_OSS_CLOUD_API_URL (local Ollama by default)."""
+    kwargs.setdefault('default_model', 'gpt-oss:120b-cloud')
+    kwargs.setdefault('url_env', 'GPT_OSS_CLOUD_API_URL')
+    kwargs.setdefault('name', 'gpt-oss')
+    return OllamaBackend(**kwargs)
+
+
+@register_backend('claude')
+class ClaudeBackend(LLMBackend):
+    """
+    Anthropic Messages API through claude_client (anthropic is imported
+    lazily). Keys and pacing come from `scheduler`, or claude_client's
+    process-wide KeyScheduler.
+    """
+    name = 'claude'
+
+    def __init__(self, default_model: str = 'claude-2.1', scheduler=None):
+        self.default_model = default_model
+        self.scheduler = scheduler
+
+    def chat(self, prompt, model=None, system_prompt=None, max_tokens=200, temperature=0.7):
+        from src.agent.claude_client import claude_chat
+        return claude_chat(prompt, system_prompt=system_prompt, max_tokens=max_tokens,
+                           temperature=temperature, model=model or self.default_model,
+                           scheduler=self.scheduler)
+
+    async def achat(self, prompt, model=None, system_prompt=None, max_tokens=200, temperature=0.7):
+        from src.agent.claude_client import aclaude_chat
+        return await aclaude_chat(prompt, system_prompt=system_prompt, max_tokens=max_tokens,
+                                  temperature=temperature, model=model or self.default_model,
+                                  scheduler=self.scheduler)
+
+
+@register_backend('replay')
+def replay_backend(path: str = 'results/exp1_repro.json', strict: bool = False) -> LLMBackend:
+    from src.agent.replay import ReplayLLM
+    return ReplayLLM.from_file(path, strict=strict)
+
+
+@register_backend('mock')
+def mock_backend(url: Optional[str] = None, **kwargs) -> OllamaBackend:
+    """Ollama backend pointed at a MockOllamaServer (started here unless url is given)."""
+    if url is None:
+        from src.agent.mock_server import MockOllamaServer
+        url = MockOllamaServer(**kwargs).start().url
+    return OllamaBackend(url=url, default_model='mock', name='mock')
@@ -1,21 +1,22 @@
-
-
-
 import logging
-from src.emotion.analyzer import EmotionalAppraisal
-from src.agent.gpt_oss_client import gpt_oss_cloud_chat
+from typing import Optional
+from src.agent.components import AgentComponents
 
 logger = logging.getLogger('AMN')
 
 class BaselineAgent:
-    def __init__(self, model="gpt-oss:120b-cloud"):
-        self.appraiser = EmotionalAppraisal()
+    def __init__(self, model="gpt-oss:120b-cloud", components: Optional[AgentComponents] = None):
+        self.components = components or AgentComponents()
         self.model = model
 
+    @property
+    def appraiser(self):
+        return self.components.appraiser
+
     def step(self, user_input: str) -> str:
-        vad = self.appraiser.analyze(user_input)['vad']
+        # No memory, no appraisal: the prompt is the input alone
         prompt = f"Respond empathetically to: {user_input}"
-        reply = gpt_oss_cloud_chat(
+        reply = self.components.chat(
             prompt,
             model=self.model,
             max_tokens=200,
@@ -1,19 +1,104 @@
-import os
+import threading
 import anthropic
+from src.agent.api_key_rotator import KeyScheduler
 
 # Claude chat function for Anthropic API
+#
+# One client (and connection pool) per API key, reused across calls. Keys
+# come from a KeyScheduler: ANTHROPIC_API_KEYS (comma-separated) or
+# ANTHROPIC_API_KEY, paced by ANTHROPIC_RPM / ANTHROPIC_TPM. A quota or
+# rate-limit error quarantines the key and the call moves to the next one.
 
-def claude_chat(prompt, system_prompt=None, max_tokens=200, temperature=0.7, model="claude-2.1"):
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
-        raise RuntimeError("ANTHROPIC_API_KEY environment variable not set.")
-    client = anthropic.Anthropic(api_key=api_key)
+_clients = {}
+_async_clients = {}
+_scheduler = None
+_lock = threading.Lock()
+
+
+def get_scheduler() -> KeyScheduler:
+    global _scheduler
+    with _lock:
+        if _scheduler is None:
+            try:
+                _scheduler = KeyScheduler.from_env()
+            except RuntimeError:
+                raise RuntimeError("ANTHROPIC_API_KEY environment variable not set.")
+        return _scheduler
+
+
+def _client(api_key, pool, cls):
+    with _lock:
+        client = pool.get(api_key)
+        if client is None:
+            client = pool[api_key] = cls(api_key=api_key)
+        return client
+
+
+def _is_quota_error(e):
+    return getattr(e, 'status_code', None) == 429 or any(
+        w in str(e).lower() for w in ('quota', 'rate limit', 'rate_limit', 'credit balance'))
+
+
+def _retry_after(e):
+    response = getattr(e, 'response', None)
+    try:
+        return float(response.headers['retry-after'])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _request(prompt, system_prompt, max_tokens, temperature, model):
     system = system_prompt or "You are an emotionally aware agent."
-    response = client.messages.create(
-        model=model,
-        max_tokens=max_tokens,
-        temperature=temperature,
-        system=system,
-        messages=[{"role": "user", "content": prompt}]
-    )
+    # ~4 characters per token, plus the whole output budget
+    estimate = (len(prompt) + len(system)) // 4 + max_tokens
+    kwargs = dict(model=model, max_tokens=max_tokens, temperature=temperature, system=system,
+                  messages=[{"role": "user", "content": prompt}])
+    return estimate, kwargs
+
+
+def _finish(scheduler, key, estimate, response):
+    usage = getattr(response, 'usage', None)
+    if usage is not None:
+        scheduler.settle(key, estimate, usage.input_tokens + usage.output_tokens)
     return response.content[0].text.strip() if hasattr(response.content[0], 'text') else response.content[0]['text'].strip()
+
+
+def _on_error(scheduler, key, estimate, e, attempt):
+    """
+    Return the failed call's token reservation, quarantine the key on quota
+    errors, and re-raise unless another key may be tried.
+    """
+    scheduler.settle(key, estimate, 0)
+    if not _is_quota_error(e):
+        raise e
+    scheduler.quarantine(key, _retry_after(e))
+    if attempt == len(scheduler.keys) - 1:
+        raise e
+
+
+def claude_chat(prompt, system_prompt=None, max_tokens=200, temperature=0.7, model="claude-2.1", scheduler=None):
+    scheduler = scheduler or get_scheduler()
+    estimate, kwargs = _request(prompt, system_prompt, max_tokens, temperature, model)
+    for attempt in range(len(scheduler.keys)):
+        key = scheduler.acquire(estimate)
+        try:
+            response = _client(key, _clients, anthropic.Anthropic).messages.create(**kwargs)
+        except anthropic.APIError as e:
+            _on_error(scheduler, key, estimate, e, attempt)
+        else:
+            return _finish(scheduler, key, estimate, response)
+
+
+async def aclaude_chat(prompt, system_prompt=None, max_tokens=200, temperature=0.7, model="claude-2.1",
+                       scheduler=None):
+    """Non-blocking claude_chat; one AsyncAnthropic (and connection pool) per API key."""
+    scheduler = scheduler or get_scheduler()
+    estimate, kwargs = _request(prompt, system_prompt, max_tokens, temperature, model)
+    for attempt in range(len(scheduler.keys)):
+        key = await scheduler.aacquire(estimate)
+        try:
+            response = await _client(key, _async_clients, anthropic.AsyncAnthropic).messages.create(**kwargs)
+        except anthropic.APIError as e:
+            _on_error(scheduler, key, estimate, e, attempt)
+        else:
+            return _finish(scheduler, key, estimate, response)
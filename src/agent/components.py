@@ -0,0 +1,208 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Executor
+from functools import partial
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Union
+import numpy as np
+from src.emotion.analyzer import VAD, FullEmotionalAppraisal, lazarus_from_vad
+from src.agent.backends import LLMBackend, get_backend
+from src.agent.llm_cache import LLMResponseCache
+
+
+class CachedAppraiser:
+    """
+    LRU memo over an appraiser's analyze() / full_appraisal(). Every
+    condition of an experiment appraises the same user turn, so with one
+    shared instance each turn is appraised once, not once per agent.
+    Thread-safe, since async agents appraise on executor threads.
+    """
+
+    def __init__(self, appraiser: FullEmotionalAppraisal, maxsize: int = 4096):
+        self.appraiser = appraiser
+        self.lexicon = appraiser.lexicon
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _memo(self, kind: str, text: str, fn: Callable[[str], Dict]) -> Dict:
+        key = (kind, text)
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = fn(text)
+        with self._lock:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def analyze(self, text: str) -> Dict:
+        return self._memo('analyze', text, self.appraiser.analyze)
+
+    def full_appraisal(self, text: str) -> Dict:
+        return self._memo('full', text, self.appraiser.full_appraisal)
+
+
+class NeutralAppraiser:
+    """
+    Stand-in for agents that never read stored appraisals: returns the VAD a
+    lexicon miss would give, without tokenizing anything.
+    """
+    lexicon: Dict = {}
+
+    def analyze(self, text: str) -> Dict:
+        vad = VAD(0.0, 0.0, 0.0)
+        return {'vad': vad, 'lexicon': vad}
+
+    def full_appraisal(self, text: str) -> Dict:
+        vad = VAD(0.0, 0.0, 0.0)
+        return {'lazarus': lazarus_from_vad(vad), 'vad': vad, 'consolidate': False}
+
+
+class MetricsSink:
+    """Named series of measurements (latencies, counts) shared by agents."""
+
+    def __init__(self):
+        self.series: Dict[str, List[float]] = defaultdict(list)
+
+    def record(self, name: str, value: float):
+        self.series[name].append(value)
+
+    def summary(self) -> Dict[str, float]:
+        out = {}
+        for name, values in self.series.items():
+            out[f'{name}_mean'] = float(np.mean(values))
+            out[f'{name}_n'] = len(values)
+        return out
+
+
+class AgentComponents:
+    """
+    Shared dependencies for the experiment agents: one lexicon-backed
+    appraiser (built on first use, memoized), the LLM client (blocking and
+    streaming) and a metrics sink. Pass one instance to every agent so
+    building four conditions costs about as much as building one.
+
+    lean=True skips appraisal nobody reads: agents that neither score nor
+    show stored VADs keep their turns with a NeutralAppraiser.
+
+    For async agents, allm is the non-blocking client and run_blocking()
+    moves CPU-bound appraisal/retrieval onto `executor` (the loop's default
+    thread pool when None), so the event loop keeps other turns moving.
+
+    `backend` is an LLMBackend or a registered backend name ('gpt-oss',
+    'ollama', 'claude', 'replay', 'mock', ...); llm / stream_llm / allm
+    default to its chat / stream / achat. An LLMResponseCache, if given,
+    sits in front of all three, keyed on the backend name (blocking,
+    streaming and async calls to the same backend share entries).
+    """
+
+    def __init__(self, llm: Optional[Callable[..., str]] = None,
+                 appraiser: Optional[FullEmotionalAppraisal] = None,
+                 cache_size: int = 4096, metrics: Optional[MetricsSink] = None,
+                 lean: bool = False, stream_llm: Optional[Callable[..., Iterator[str]]] = None,
+                 allm: Optional[Callable[..., Awaitable[str]]] = None,
+                 executor: Optional[Executor] = None,
+                 llm_cache: Optional[LLMResponseCache] = None,
+                 backend: Union[str, LLMBackend] = 'gpt-oss'):
+        self.backend = get_backend(backend)
+        self.llm = llm or self.backend.chat
+        self.stream_llm = stream_llm or self.backend.stream
+        self.allm = allm or self.backend.achat
+        self.llm_cache = llm_cache
+        if llm_cache is not None:
+            name = self.backend.name
+            self.llm = llm_cache.wrap(self.llm, name)
+            self.stream_llm = llm_cache.wrap_stream(self.stream_llm, name)
+            self.allm = llm_cache.wrap_async(self.allm, name)
+        self.executor = executor
+        self.last_prompt: Optional[str] = None  # saved into transcripts for replay checks
+        self._base_appraiser = appraiser
+        self._appraiser: Optional[CachedAppraiser] = None
+        self._appraiser_lock = threading.Lock()
+        self.cache_size = cache_size
+        self.metrics = metrics or MetricsSink()
+        self.lean = lean
+
+    @property
+    def appraiser(self) -> CachedAppraiser:
+        # Double-checked: agents built on several threads must share one appraiser
+        if self._appraiser is None:
+            with self._appraiser_lock:
+                if self._appraiser is None:
+                    base = self._base_appraiser or FullEmotionalAppraisal()
+                    self._appraiser = CachedAppraiser(base, self.cache_size)
+        return self._appraiser
+
+    @property
+    def lexicon(self) -> Dict:
+        return self.appraiser.lexicon
+
+    def turn_appraiser(self, reads_appraisal: bool = True):
+        """Appraiser for an agent's WorkingMemory: shared, or neutral in lean mode."""
+        if self.lean and not reads_appraisal:
+            return NeutralAppraiser()
+        return self.appraiser
+
+    def chat(self, prompt: str, **kwargs) -> str:
+        self.last_prompt = prompt
+        start = time.perf_counter()
+        reply = self.llm(prompt, **kwargs)
+        self.metrics.record('llm_ms', (time.perf_counter() - start) * 1000)
+        return reply
+
+    async def achat(self, prompt: str, **kwargs) -> str:
+        self.last_prompt = prompt
+        start = time.perf_counter()
+        reply = await self.allm(prompt, **kwargs)
+        self.metrics.record('llm_ms', (time.perf_counter() - start) * 1000)
+        return reply
+
+    async def run_blocking(self, fn: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    def chat_stream(self, prompt: str, stats: Optional[Dict] = None, **kwargs) -> Iterator[str]:
+        """
+        Yield reply chunks as they arrive. When the stream ends or is closed,
+        time-to-first-token and tokens/sec (one chunk ~ one token) go to the
+        metrics sink and into stats, if given.
+        """
+        stats = {} if stats is None else stats
+        self.last_prompt = prompt
+        start = time.perf_counter()
+        first = None
+        n_chunks = 0
+        try:
+            for chunk in self.stream_llm(prompt, **kwargs):
+                if first is None:
+                    first = time.perf_counter()
+                n_chunks += 1
+                yield chunk
+        finally:
+            end = time.perf_counter()
+            stats.update(total_ms=(end - start) * 1000, chunks=n_chunks)
+            self.metrics.record('llm_ms', stats['total_ms'])
+            if first is not None:
+                stats['ttft_ms'] = (first - start) * 1000
+                self.metrics.record('ttft_ms', stats['ttft_ms'])
+                if n_chunks > 1 and end > first:
+                    stats['tokens_per_s'] = (n_chunks - 1) / (end - first)
+                    self.metrics.record('tokens_per_s', stats['tokens_per_s'])
+
+    def summary(self) -> Dict[str, float]:
+        out = self.metrics.summary()
+        if self._appraiser is not None:
+            total = self._appraiser.hits + self._appraiser.misses
+            out['appraisal_cache_hit_ratio'] = self._appraiser.hits / total if total else 0.0
+        if self.llm_cache is not None:
+            out.update(self.llm_cache.metrics())
+        return out
@@ -1,22 +1,18 @@
-import requests
-import os
+from src.agent.backends import gpt_oss_backend
 
-def gpt_oss_cloud_chat(prompt, model="gpt-oss:120b-cloud", system_prompt=None, max_tokens=200, temperature=0.7):
-    # Use Ollama's chat endpoint by default
-    api_url = os.environ.get("GPT_OSS_CLOUD_API_URL", "http://localhost:11434/api/chat")
-    messages = []
-    if system_prompt:
-        messages.append({"role": "system", "content": system_prompt})
-    messages.append({"role": "user", "content": prompt})
-    payload = {
-        "model": model,
-        "messages": messages,
-        "stream": False,
-        "options": {
-            "temperature": temperature,
-            "num_predict": max_tokens
-        }
-    }
-    response = requests.post(api_url, json=payload, timeout=30)
-    response.raise_for_status()
-    return response.json()["message"]["content"].strip()
+# Thin wrappers over the 'gpt-oss' backend (Ollama's chat endpoint by default,
+# GPT_OSS_CLOUD_API_URL when set)
+
+def gpt_oss_cloud_chat(prompt, model="gpt-oss:120b-cloud", system_prompt=None, max_tokens=200, temperature=0.7,
+                       client=None):
+    return gpt_oss_backend(client=client).chat(prompt, model, system_prompt, max_tokens, temperature)
+
+def gpt_oss_cloud_chat_stream(prompt, model="gpt-oss:120b-cloud", system_prompt=None, max_tokens=200,
+                              temperature=0.7, client=None):
+    """Yield reply text chunks as the server generates them."""
+    yield from gpt_oss_backend(client=client).stream(prompt, model, system_prompt, max_tokens, temperature)
+
+async def agpt_oss_cloud_chat(prompt, model="gpt-oss:120b-cloud", system_prompt=None, max_tokens=200,
+                              temperature=0.7, client=None):
+    """Non-blocking gpt_oss_cloud_chat over the shared async connection pool."""
+    return await gpt_oss_backend(async_client=client).achat(prompt, model, system_prompt, max_tokens, temperature)
@@ -0,0 +1,199 @@
+import json
+import random
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+import logging
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger('AMN')
+
+
+class _RetryingClient:
+    """
+    Retry policy and latency record shared by the sync and async pooled
+    clients: connection errors and 5xx responses are retried with
+    full-jitter exponential backoff (sleep ~ U(0, min(max_backoff,
+    backoff * 2**attempt))); read timeouts and 4xx are raised at once.
+    Latency of every request, retries included, is recorded.
+    """
+    RETRY_STATUS = frozenset({500, 502, 503, 504})
+
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 3.05,
+                 read_timeout: float = 30.0, max_retries: int = 3,
+                 backoff: float = 0.5, max_backoff: float = 8.0):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self.latencies_ms: List[float] = []
+        self.retries = 0
+
+    def _delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _done(self, status: int, attempt: int) -> bool:
+        """Whether a response with this status ends the attempts."""
+        return status not in self.RETRY_STATUS or attempt == self.max_retries
+
+    def _retrying(self, url: str, attempt: int, reason):
+        logger.warning(f"POST {url} {reason}, retry {attempt + 1}")
+        self.retries += 1
+
+    def metrics(self) -> Dict[str, float]:
+        if not self.latencies_ms:
+            return {}
+        lat = np.array(self.latencies_ms)
+        return {
+            'http_requests': len(lat),
+            'http_retries': self.retries,
+            'http_ms_mean': float(lat.mean()),
+            'http_ms_p50': float(np.percentile(lat, 50)),
+            'http_ms_p95': float(np.percentile(lat, 95)),
+        }
+
+
+class PooledHTTPClient(_RetryingClient):
+    """
+    One requests.Session with a keep-alive connection pool shared by the
+    Ollama / gpt-oss clients, retried as in _RetryingClient.
+    """
+
+    def __init__(self, pool_size: int = 10, **kwargs):
+        super().__init__(pool_size=pool_size, **kwargs)
+        self.session = self._make_session()
+
+    def _make_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _sleep(self, attempt: int):
+        time.sleep(self._delay(attempt))
+
+    def _post(self, url: str, payload: Dict, **kwargs) -> requests.Response:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout, **kwargs)
+            except requests.ConnectionError as e:
+                if attempt == self.max_retries:
+                    raise
+                self._retrying(url, attempt, f"failed ({e.__class__.__name__})")
+            else:
+                if self._done(response.status_code, attempt):
+                    response.raise_for_status()
+                    return response
+                response.close()
+                self._retrying(url, attempt, f"returned {response.status_code}")
+            self._sleep(attempt)
+
+    def post_json(self, url: str, payload: Dict, **kwargs) -> Dict:
+        start = time.perf_counter()
+        try:
+            return self._post(url, payload, **kwargs).json()
+        finally:
+            self.latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    def post_stream(self, url: str, payload: Dict, **kwargs) -> Iterator[Dict]:
+        """
+        Yield each line of a newline-delimited JSON response as it arrives.
+        Retries apply only until the response starts; the connection returns
+        to the pool when the stream is exhausted or the generator is closed.
+        """
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self._post(url, payload, stream=True, **kwargs)
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+        finally:
+            if response is not None:
+                response.close()
+            self.latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncPooledHTTPClient(_RetryingClient):
+    """
+    Non-blocking counterpart of PooledHTTPClient on httpx.AsyncClient, with
+    the same retry policy and latency record. pool_size caps concurrent
+    connections; requests beyond it wait for a free connection instead of
+    opening new ones. The httpx client is bound to the event loop it was
+    created in and is rebuilt if used from another loop.
+    """
+
+    def __init__(self, pool_size: int = 100, **kwargs):
+        super().__init__(pool_size=pool_size, **kwargs)
+        self.session = None
+        self._loop = None
+
+    def _async_session(self):
+        import asyncio
+        import httpx
+        loop = asyncio.get_running_loop()
+        if self.session is None or self._loop is not loop:
+            connect, read = self.timeout
+            self.session = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.pool_size,
+                                    max_keepalive_connections=self.pool_size),
+                timeout=httpx.Timeout(read, connect=connect, pool=None))
+            self._loop = loop
+        return self.session
+
+    async def post_json(self, url: str, payload: Dict, **kwargs) -> Dict:
+        import asyncio
+        import httpx
+        session = self._async_session()
+        start = time.perf_counter()
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = await session.post(url, json=payload, **kwargs)
+                except (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError) as e:
+                    if attempt == self.max_retries:
+                        raise
+                    self._retrying(url, attempt, f"failed ({e.__class__.__name__})")
+                else:
+                    if self._done(response.status_code, attempt):
+                        response.raise_for_status()
+                        return response.json()
+                    self._retrying(url, attempt, f"returned {response.status_code}")
+                await asyncio.sleep(self._delay(attempt))
+        finally:
+            self.latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    async def aclose(self):
+        if self.session is not None:
+            await self.session.aclose()
+            self.session = None
+
+
+_default: Optional[PooledHTTPClient] = None
+_default_async: Optional[AsyncPooledHTTPClient] = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> PooledHTTPClient:
+    """Process-wide pooled client, created on first use."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = PooledHTTPClient()
+        return _default
+
+
+def get_async_client() -> AsyncPooledHTTPClient:
+    """Process-wide async pooled client, created on first use."""
+    global _default_async
+    with _default_lock:
+        if _default_async is None:
+            _default_async = AsyncPooledHTTPClient()
+        return _default_async
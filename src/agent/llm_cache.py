@@ -0,0 +1,164 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional
+import logging
+
+logger = logging.getLogger('AMN')
+
+MODES = ('record', 'read-only', 'refresh')
+
+
+class LLMResponseCache:
+    """
+    Content-addressed SQLite cache of LLM replies, keyed on
+    sha256(backend, model, system prompt, prompt, temperature, max_tokens, seed).
+
+    Modes: 'record' serves hits and stores misses; 'read-only' serves hits
+    and never writes; 'refresh' always calls the backend and overwrites.
+    When the stored replies exceed max_bytes, least recently used rows are
+    evicted. wrap() / wrap_async() / wrap_stream() put the cache in front of
+    a chat function without changing its signature.
+    """
+
+    def __init__(self, path: str = 'results/cache/llm_responses.sqlite', mode: str = 'record',
+                 max_bytes: int = 256 * 1024 * 1024):
+        if mode not in MODES:
+            raise ValueError(f"Unknown LLM cache mode: {mode} (expected one of {MODES})")
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, reply TEXT, size INTEGER, last_used REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used)")
+        self._db.commit()
+        # Running size of the stored replies, so a put does not re-sum the table
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> Optional['LLMResponseCache']:
+        """Cache configured by AMN_LLM_CACHE=<mode> (and AMN_LLM_CACHE_PATH), or None."""
+        mode = os.environ.get('AMN_LLM_CACHE')
+        if not mode or mode == 'off':
+            return None
+        path = os.environ.get('AMN_LLM_CACHE_PATH', 'results/cache/llm_responses.sqlite')
+        return cls(path, mode)
+
+    @staticmethod
+    def key(backend: str, model: str, system_prompt: Optional[str], prompt: str,
+            temperature: float, max_tokens: int, seed: Optional[int] = None) -> str:
+        fields = [backend, model, system_prompt, prompt, temperature, max_tokens, seed]
+        return hashlib.sha256(json.dumps(fields).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if self.mode == 'refresh':
+            return None
+        with self._lock:
+            row = self._db.execute("SELECT reply FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if self.mode == 'record':
+                self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+            return row[0]
+
+    def put(self, key: str, reply: str):
+        if self.mode == 'read-only':
+            return
+        size = len(reply.encode('utf-8'))
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                             (key, reply, size, time.time()))
+            self._bytes += size - (old[0] if old else 0)
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        if self._bytes <= self.max_bytes:
+            return
+        freed = 0
+        victims = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            if self._bytes - freed <= self.max_bytes:
+                break
+            victims.append((key,))
+            freed += size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self._bytes -= freed
+        logger.info(f"LLM cache evicted {len(victims)} replies ({freed} bytes)")
+
+    def _key_for(self, fn: Callable, backend: str, prompt: str, args, kwargs) -> str:
+        sig = inspect.signature(fn)
+        bound = sig.bind(prompt, *args, **kwargs)
+        bound.apply_defaults()
+        a = dict(bound.arguments)
+        # A **kwargs client receives model, temperature, ... inside one dict
+        for name, param in sig.parameters.items():
+            if param.kind is inspect.Parameter.VAR_KEYWORD:
+                a.update(a.pop(name, {}))
+        return self.key(backend, a.get('model'), a.get('system_prompt'), prompt,
+                        a.get('temperature'), a.get('max_tokens'), a.get('seed'))
+
+    def wrap(self, fn: Callable[..., str], backend: str) -> Callable[..., str]:
+        @functools.wraps(fn)
+        def cached(prompt, *args, **kwargs):
+            key = self._key_for(fn, backend, prompt, args, kwargs)
+            reply = self.get(key)
+            if reply is None:
+                reply = fn(prompt, *args, **kwargs)
+                self.put(key, reply)
+            return reply
+        return cached
+
+    def wrap_async(self, fn: Callable, backend: str) -> Callable:
+        @functools.wraps(fn)
+        async def cached(prompt, *args, **kwargs):
+            key = self._key_for(fn, backend, prompt, args, kwargs)
+            reply = self.get(key)
+            if reply is None:
+                reply = await fn(prompt, *args, **kwargs)
+                self.put(key, reply)
+            return reply
+        return cached
+
+    def wrap_stream(self, fn: Callable[..., Iterator[str]], backend: str) -> Callable[..., Iterator[str]]:
+        """A hit is replayed as one chunk; a miss is stored only if the stream completes."""
+        @functools.wraps(fn)
+        def cached(prompt, *args, **kwargs):
+            key = self._key_for(fn, backend, prompt, args, kwargs)
+            reply = self.get(key)
+            if reply is not None:
+                yield reply
+                return
+            chunks = []
+            for chunk in fn(prompt, *args, **kwargs):
+                chunks.append(chunk)
+                yield chunk
+            self.put(key, ''.join(chunks).strip())
+        return cached
+
+    def metrics(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'llm_cache_hits': self.hits,
+            'llm_cache_misses': self.misses,
+            'llm_cache_hit_ratio': self.hits / total if total else 0.0,
+        }
+
+    def close(self):
+        self._db.close()
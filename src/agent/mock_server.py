@@ -0,0 +1,190 @@
+"""
+Local stand-in for Ollama's /api/chat, for load tests without network or GPU.
+Usage: python -m src.agent.mock_server --port 11434 --latency lognormal --latency_ms 300 --tokens_per_s 40
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger('AMN')
+
+LATENCIES = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+_WORDS = ("I hear you and that sounds really hard . It makes sense to feel this way given "
+          "everything you have been dealing with lately . What part of it weighs on you the most "
+          "right now ? You mentioned before that work has been stressful , and I remember how much "
+          "that promotion mattered to you .").split()
+
+
+class MockOllamaServer:
+    """
+    Threaded HTTP server speaking the Ollama /api/chat protocol, blocking and
+    streaming (NDJSON over chunked HTTP/1.1, so clients keep connections
+    alive).
+
+    Each request waits a time-to-first-token drawn from `latency` around
+    latency_ms (fixed, uniform on [0, 2x], exponential, or lognormal with
+    median latency_ms and log-sd latency_sigma), then emits tokens at
+    tokens_per_s. With probability error_rate it answers error_status
+    instead. The reply is a function of the prompt alone and the random draws
+    of request n come from (seed, n), so a run is reproducible given the
+    request order.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: str = 'lognormal',
+                 latency_ms: float = 200.0, latency_sigma: float = 0.5, tokens_per_s: float = 50.0,
+                 reply_tokens: int = 40, error_rate: float = 0.0, error_status: int = 503, seed: int = 0):
+        if latency not in LATENCIES:
+            raise ValueError(f"Unknown latency distribution: {latency} (expected one of {LATENCIES})")
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_s = tokens_per_s
+        self.reply_tokens = reply_tokens
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.seed = seed
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api/chat"
+
+    def _draw(self):
+        """(fail, ttft seconds) for the next request."""
+        with self._lock:
+            n = self.requests
+            self.requests += 1
+        rng = random.Random(f"{self.seed}:{n}")
+        fail = rng.random() < self.error_rate
+        ms = self.latency_ms
+        if self.latency == 'uniform':
+            ms = rng.uniform(0, 2 * self.latency_ms)
+        elif self.latency == 'exponential':
+            ms = rng.expovariate(1 / self.latency_ms) if self.latency_ms > 0 else 0.0
+        elif self.latency == 'lognormal':
+            ms = self.latency_ms * rng.lognormvariate(0, self.latency_sigma)
+        if fail:
+            with self._lock:
+                self.errors += 1
+        return fail, ms / 1000
+
+    def reply(self, prompt: str, max_tokens: int) -> List[str]:
+        """Deterministic reply tokens for a prompt."""
+        h = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest(), 16)
+        start = h % len(_WORDS)
+        n = min(self.reply_tokens, max_tokens)
+        return [_WORDS[(start + i) % len(_WORDS)] + ' ' for i in range(n)]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, body: Dict):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _chunk(self, body: Dict):
+                data = json.dumps(body).encode('utf-8') + b'\n'
+                self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+                self.wfile.flush()
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                if self.path != '/api/chat':
+                    self._send_json(404, {'error': f'unknown path {self.path}'})
+                    return
+                fail, ttft = server._draw()
+                time.sleep(ttft)
+                if fail:
+                    self._send_json(server.error_status, {'error': 'injected failure'})
+                    return
+                messages = body.get('messages', [])
+                prompt = messages[-1]['content'] if messages else ''
+                max_tokens = body.get('options', {}).get('num_predict', server.reply_tokens)
+                tokens = server.reply(prompt, max_tokens)
+                per_token = 1 / server.tokens_per_s if server.tokens_per_s > 0 else 0.0
+                model = body.get('model', 'mock')
+                if not body.get('stream', True):
+                    time.sleep(per_token * len(tokens))
+                    self._send_json(200, {'model': model, 'done': True,
+                                          'message': {'role': 'assistant', 'content': ''.join(tokens)},
+                                          'eval_count': len(tokens)})
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for i, token in enumerate(tokens):
+                    if i:
+                        time.sleep(per_token)
+                    self._chunk({'model': model, 'done': False,
+                                 'message': {'role': 'assistant', 'content': token}})
+                self._chunk({'model': model, 'done': True, 'message': {'role': 'assistant', 'content': ''},
+                             'eval_count': len(tokens)})
+                self.wfile.write(b'0\r\n\r\n')
+
+        return Handler
+
+    def start(self) -> 'MockOllamaServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Mock Ollama server listening on {self.url}")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'MockOllamaServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def metrics(self) -> Dict[str, float]:
+        return {'mock_requests': self.requests, 'mock_errors': self.errors}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--latency', choices=LATENCIES, default='lognormal')
+    parser.add_argument('--latency_ms', type=float, default=200.0)
+    parser.add_argument('--latency_sigma', type=float, default=0.5)
+    parser.add_argument('--tokens_per_s', type=float, default=50.0)
+    parser.add_argument('--reply_tokens', type=int, default=40)
+    parser.add_argument('--error_rate', type=float, default=0.0)
+    parser.add_argument('--error_status', type=int, default=503)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    server = MockOllamaServer(**vars(args))
+    print(f"Serving {server.url} (Ctrl-C to stop)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -1,31 +1,33 @@
-
-import requests
+from src.agent.backends import OllamaBackend
 
 def ollama_chat(
     prompt,
     model="tinyllama",
     system_prompt=None,
     max_tokens=200,
-    temperature=0.7
+    temperature=0.7,
+    client=None
+):
+    return OllamaBackend(client=client).chat(prompt, model, system_prompt, max_tokens, temperature)
+
+def ollama_chat_stream(
+    prompt,
+    model="tinyllama",
+    system_prompt=None,
+    max_tokens=200,
+    temperature=0.7,
+    client=None
+):
+    """Yield reply text chunks as the local model generates them."""
+    yield from OllamaBackend(client=client).stream(prompt, model, system_prompt, max_tokens, temperature)
+
+async def aollama_chat(
+    prompt,
+    model="tinyllama",
+    system_prompt=None,
+    max_tokens=200,
+    temperature=0.7,
+    client=None
 ):
-    url = "http://localhost:11434/api/chat"
-    messages = []
-    if system_prompt:
-        messages.append({"role": "system", "content": system_prompt})
-    messages.append({"role": "user", "content": prompt})
-    payload = {
-        "model": model,
-        "messages": messages,
-        "stream": False,
-        "options": {
-            "temperature": temperature,
-            "num_predict": max_tokens
-        }
-    }
-    response = requests.post(
-        url,
-        json=payload,
-        timeout=30
-    )
-    response.raise_for_status()
-    return response.json()["message"]["content"].strip()
+    """Non-blocking ollama_chat over the shared async connection pool."""
+    return await OllamaBackend(async_client=client).achat(prompt, model, system_prompt, max_tokens, temperature)
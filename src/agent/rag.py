@@ -1,29 +1,34 @@
 
 
 import numpy as np
-from src.agent.baseline import BaselineAgent
-from src.memory.core import WorkingMemory, EpisodicMemory
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import Optional
+from src.agent.components import AgentComponents
+from src.memory.core import MemoryStore, WorkingMemory, EpisodicMemory
+from src.retrieval.tfidf import TfidfIndex
 import logging
-from src.agent.gpt_oss_client import gpt_oss_cloud_chat
 
 logger = logging.getLogger('AMN')
 
 class SemanticRAGAgent:
-    def __init__(self, model="gpt-oss:120b-cloud"):
-        self.baseline = BaselineAgent(model=model)
-        self.wm = WorkingMemory()
-        self.em = EpisodicMemory()
+    def __init__(self, model="gpt-oss:120b-cloud", components: Optional[AgentComponents] = None):
+        self.components = components or AgentComponents()
+        self.store = MemoryStore()
+        # Retrieval is purely lexical: in lean mode stored turns are not appraised
+        self.wm = WorkingMemory(store=self.store,
+                                appraiser=self.components.turn_appraiser(reads_appraisal=False))
+        self.em = EpisodicMemory(store=self.store)
+        # Each turn is vectorized once, on insert; queries never refit
+        self.index = TfidfIndex()
+        self.store.subscribe(self.index)
         self.model = model
 
     def step(self, user_input: str) -> str:
-        vad = self.baseline.appraiser.analyze(user_input)['vad']
-        all_mems = self.wm.get_all() + self.em.get_recent(50)
+        # Both tiers share one store; dedupe so a turn is not retrieved twice
+        all_mems = list({m.id: m for m in self.wm.get_all() + self.em.get_recent(50)}.values())
         if not all_mems:
             # No memories yet, just respond to the user input
             prompt = f"SEMANTIC MEMORIES: (none)\nCURRENT: {user_input}\nRespond:"
-            reply = gpt_oss_cloud_chat(
+            reply = self.components.chat(
                 prompt,
                 model=self.model,
                 max_tokens=200,
@@ -33,15 +38,11 @@ class SemanticRAGAgent:
             entry = self.wm.add(full_turn)
             self.em.add(entry)
             return reply
-        vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
-        vectorizer.fit([user_input] + [m.content for m in all_mems])
-        q_vec = vectorizer.transform([user_input])
-        mem_vecs = vectorizer.transform([m.content for m in all_mems])
-        similarities = cosine_similarity(q_vec, mem_vecs)[0]
+        similarities = self.index.scores(user_input, [m.id for m in all_mems])
         top_indices = np.argsort(similarities)[-3:][::-1]
         context = "\n".join([f"PAST: {all_mems[i].content[:150]}..." for i in top_indices])
         prompt = f"SEMANTIC MEMORIES: {context}\nCURRENT: {user_input}\nRespond:"
-        reply = gpt_oss_cloud_chat(
+        reply = self.components.chat(
             prompt,
             model=self.model,
             max_tokens=200,
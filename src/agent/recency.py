@@ -1,19 +1,22 @@
 
 
 import logging
-from src.agent.baseline import BaselineAgent
-from src.memory.core import WorkingMemory, EpisodicMemory
-from src.retrieval.engine import RetrievalEngine
-from src.agent.gpt_oss_client import gpt_oss_cloud_chat
+from typing import Optional
+from src.agent.components import AgentComponents
+from src.memory.core import MemoryStore, WorkingMemory, EpisodicMemory
+from src.retrieval.recency import RecencyRetriever
 
 logger = logging.getLogger('AMN')
 
 class RecencyAgent:
-    def __init__(self, model="gpt-oss:120b-cloud"):
-        self.baseline = BaselineAgent(model=model)
-        self.wm = WorkingMemory()
-        self.em = EpisodicMemory()
-        self.retriever = RetrievalEngine(self.wm, self.em, k=3)
+    def __init__(self, model="gpt-oss:120b-cloud", components: Optional[AgentComponents] = None):
+        self.components = components or AgentComponents()
+        self.model = model
+        self.store = MemoryStore()
+        # Stored VADs are shown in the prompt, so turns are always appraised
+        self.wm = WorkingMemory(store=self.store, appraiser=self.components.turn_appraiser())
+        self.em = EpisodicMemory(store=self.store)
+        self.retriever = RecencyRetriever(self.store, k=3)
 
     def _format_context(self, retrieved):
         ctx = []
@@ -26,14 +29,13 @@ class RecencyAgent:
         return "\n".join(ctx)
 
     def step(self, user_input: str) -> str:
-        vad = self.baseline.appraiser.analyze(user_input)['vad']
-        retrieved = self.retriever.retrieve(user_input, vad)
-        retrieved = sorted(retrieved, key=lambda x: x[0].recency_score, reverse=True)
+        # Newest first already; the query itself is never appraised or vectorized
+        retrieved = self.retriever.retrieve()
         context = self._format_context(retrieved)
         prompt = f"MEMORIES (RECENCY ONLY): {context}\nCURRENT: {user_input}\nRespond:"
-        reply = gpt_oss_cloud_chat(
+        reply = self.components.chat(
             prompt,
-            model=self.baseline.model,
+            model=self.model,
             max_tokens=200,
             temperature=0.7
         )
@@ -0,0 +1,128 @@
+import json
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+import logging
+from src.agent.backends import LLMBackend
+
+logger = logging.getLogger('AMN')
+
+
+class Divergence(NamedTuple):
+    convo_id: object
+    condition: str
+    turn: int
+    kind: str     # 'prompt' | 'user' | 'missing' | 'extra_call'
+    detail: str
+
+
+class ReplayDivergence(RuntimeError):
+    pass
+
+
+def load_transcripts(path: str) -> Dict[Tuple[object, str], List[Dict]]:
+    """
+    (convo_id, condition) -> recorded turns, from either results layout:
+    Experiment 1 (a list of conversations keyed by condition) or the ablation
+    ({'results': {config: [{'convo_id', 'turns'}]}}).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    sessions = {}
+    if isinstance(data, dict):
+        for config, convos in data.get('results', {}).items():
+            for convo in convos:
+                sessions[(convo['convo_id'], config)] = convo.get('turns', [])
+    else:
+        for convo in data:
+            for condition, turns in convo.items():
+                if isinstance(turns, list):
+                    sessions[(convo['convo_id'], condition)] = turns
+    return sessions
+
+
+class ReplayLLM(LLMBackend):
+    """
+    Chat-client stand-in that serves recorded replies by (conversation,
+    condition, turn), so the whole agent pipeline re-runs at CPU speed.
+
+    Call start(convo_id, condition) before each conversation; every call then
+    returns the next recorded reply. Each call is checked against the record:
+    the prompt must equal the recorded 'prompt' when one was saved, otherwise
+    it must contain the recorded user text. Mismatches, missing replies and
+    calls past the end are kept in `divergences`, or raised as
+    ReplayDivergence when strict.
+    """
+    name = 'replay'
+
+    def __init__(self, sessions: Dict[Tuple[object, str], List[Dict]], strict: bool = False):
+        self.sessions = sessions
+        self.strict = strict
+        self.divergences: List[Divergence] = []
+        self.calls = 0
+        self._key: Optional[Tuple[object, str]] = None
+        self._turn = 0
+
+    @classmethod
+    def from_file(cls, path: str, strict: bool = False) -> 'ReplayLLM':
+        return cls(load_transcripts(path), strict)
+
+    def start(self, convo_id, condition: str):
+        if (convo_id, condition) not in self.sessions:
+            raise KeyError(f"No recorded session for conversation {convo_id!r}, condition {condition!r}")
+        self._key = (convo_id, condition)
+        self._turn = 0
+
+    def _flag(self, kind: str, detail: str):
+        convo_id, condition = self._key
+        div = Divergence(convo_id, condition, self._turn, kind, detail)
+        self.divergences.append(div)
+        logger.warning(f"Replay divergence {div}")
+        if self.strict:
+            raise ReplayDivergence(str(div))
+
+    def _next(self, prompt: str) -> str:
+        if self._key is None:
+            raise RuntimeError("ReplayLLM.start() must be called before replaying")
+        self.calls += 1
+        self._turn += 1
+        turns = self.sessions[self._key]
+        if self._turn > len(turns):
+            self._flag('extra_call', f"only {len(turns)} turns recorded")
+            return ''
+        turn = turns[self._turn - 1]
+        recorded = turn.get('prompt')
+        if recorded is not None and recorded != prompt:
+            at = next((i for i, (a, b) in enumerate(zip(recorded, prompt)) if a != b),
+                      min(len(recorded), len(prompt)))
+            self._flag('prompt', f"prompts differ from char {at}: {prompt[at:at + 60]!r}")
+        elif recorded is None and turn.get('user') and turn['user'] not in prompt:
+            self._flag('user', f"prompt lacks recorded user text {turn['user'][:60]!r}")
+        if turn.get('agent') is None:
+            self._flag('missing', turn.get('error', 'no reply recorded'))
+            return ''
+        return turn['agent']
+
+    def turns(self, convo_id, condition: str) -> List[Dict]:
+        return self.sessions[(convo_id, condition)]
+
+    def chat(self, prompt, model=None, system_prompt=None, max_tokens=200, temperature=0.7, **kwargs) -> str:
+        return self._next(prompt)
+
+    __call__ = chat
+
+    def stream(self, prompt, model=None, system_prompt=None, max_tokens=200, temperature=0.7,
+               **kwargs) -> Iterator[str]:
+        reply = self._next(prompt)
+        if reply:
+            yield reply
+
+    async def achat(self, prompt, model=None, system_prompt=None, max_tokens=200, temperature=0.7,
+                    **kwargs) -> str:
+        return self._next(prompt)
+
+    acall = achat
+
+    def report(self) -> Dict:
+        kinds: Dict[str, int] = {}
+        for div in self.divergences:
+            kinds[div.kind] = kinds.get(div.kind, 0) + 1
+        return {'calls': self.calls, 'divergences': len(self.divergences), 'by_kind': kinds}
@@ -3,14 +3,15 @@ import os
 _root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 if _root not in sys.path:
     sys.path.insert(0, _root)
-from src.memory.core import WorkingMemory, EpisodicMemory
+from src.memory.core import MemoryStore, WorkingMemory, EpisodicMemory
 from src.retrieval.engine import RetrievalEngine
 from src.emotion.analyzer import EmotionalAppraisal
 
 class AMNAgent:
     def __init__(self):
-        self.wm = WorkingMemory()
-        self.em = EpisodicMemory()
+        self.store = MemoryStore()
+        self.wm = WorkingMemory(store=self.store)
+        self.em = EpisodicMemory(store=self.store)
         self.retriever = RetrievalEngine(self.wm, self.em)
         self.appraiser = EmotionalAppraisal()
 
@@ -52,6 +52,20 @@ class LazarusAppraisal(NamedTuple):
 
 
 
+def lazarus_from_vad(vad: VAD) -> LazarusAppraisal:
+    """Local appraisal rules; a pure function of VAD, so no text is re-read."""
+    return LazarusAppraisal(
+        vad=vad,
+        goal_relevance=max(0, vad.valence),
+        agency=vad.dominance,
+        certainty=1 - vad.arousal,
+        novelty=vad.arousal,
+        pleasantness=(vad.valence + 1) / 2,
+        control=vad.dominance
+    )
+
+
+
 class EmotionalAppraisal:
     def __init__(self, config_path: str = None,
                  data_package_dir: str = DATA_PACKAGE_PATH):
@@ -130,16 +144,7 @@ class FullEmotionalAppraisal(EmotionalAppraisal):
     def full_appraisal(self, text: str) -> Dict:
         vad_dict = self.analyze(text)
         vad = vad_dict['vad']
-        # Use local rules for LazarusAppraisal
-        lazarus = LazarusAppraisal(
-            vad=vad,
-            goal_relevance=max(0, vad.valence),
-            agency=vad.dominance,
-            certainty=1 - vad.arousal,
-            novelty=vad.arousal,
-            pleasantness=(vad.valence + 1) / 2,
-            control=vad.dominance
-        )
+        lazarus = lazarus_from_vad(vad)
         return {
             'lazarus': lazarus,
             'vad': vad,
@@ -0,0 +1,55 @@
+from typing import NamedTuple
+import numpy as np
+from src.emotion.analyzer import VAD
+
+
+class MoodState(NamedTuple):
+    mean: VAD
+    var: VAD
+    trend: VAD   # fast EWMA minus slow EWMA: >0 means the dimension is rising
+    turns: int
+
+    def surprise(self, vad: VAD) -> float:
+        """RMS z-score of vad against the session mood (0 before any turn)."""
+        if not self.turns:
+            return 0.0
+        diff = np.asarray(tuple(vad)) - np.asarray(tuple(self.mean))
+        return float(np.sqrt(np.mean(diff ** 2 / (np.asarray(tuple(self.var)) + 1e-2))))
+
+
+class MoodTracker:
+    """
+    Session affect as exponentially weighted VAD statistics, O(1) per turn.
+    Keeps an EW mean and variance (West, 1979) with `half_life` turns and a
+    faster mean with `trend_half_life` turns; their difference is the trend.
+    The first turn initialises both means, so no history is ever re-appraised.
+    """
+
+    def __init__(self, half_life: float = 5.0, trend_half_life: float = 2.0):
+        self.alpha = 1 - 0.5 ** (1 / half_life)
+        self.fast_alpha = 1 - 0.5 ** (1 / trend_half_life)
+        self.reset()
+
+    def reset(self):
+        self.mean = np.zeros(3)
+        self.var = np.zeros(3)
+        self.fast = np.zeros(3)
+        self.turns = 0
+
+    def update(self, vad: VAD) -> MoodState:
+        x = np.asarray(tuple(vad), dtype=float)
+        if not self.turns:
+            self.mean, self.fast = x.copy(), x.copy()
+        else:
+            diff = x - self.mean
+            incr = self.alpha * diff
+            self.mean = self.mean + incr
+            self.var = (1 - self.alpha) * (self.var + diff * incr)
+            self.fast = self.fast + self.fast_alpha * (x - self.fast)
+        self.turns += 1
+        return self.state
+
+    @property
+    def state(self) -> MoodState:
+        return MoodState(VAD(*map(float, self.mean)), VAD(*map(float, self.var)),
+                         VAD(*map(float, self.fast - self.mean)), self.turns)
@@ -0,0 +1,93 @@
+import numpy as np
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Hashable, Iterator, List, Optional
+from sklearn.feature_extraction.text import HashingVectorizer
+import logging
+
+logger = logging.getLogger('AMN')
+
+
+class MemoryFeaturizer:
+    """Hashed bag-of-words (L2-normalised) concatenated with weighted VAD."""
+
+    def __init__(self, n_features: int = 256, vad_weight: float = 0.5):
+        self.vad_weight = vad_weight
+        self._hasher = HashingVectorizer(n_features=n_features, alternate_sign=False,
+                                         norm='l2', stop_words='english')
+        self.dim = n_features + 3
+
+    def __call__(self, text: str, vad) -> np.ndarray:
+        bow = self._hasher.transform([text]).toarray()[0]
+        return np.concatenate([bow, self.vad_weight * np.asarray(tuple(vad), dtype=float)])
+
+
+class OnlineClusters:
+    """
+    Online mini-batch k-means (Sculley, 2010) over memory feature vectors.
+    The first n_clusters inserts seed the centroids; afterwards each insert
+    moves its nearest centroid by a per-cluster 1/count learning rate.
+    Each cluster keeps its member keys and summary statistics so retrieval
+    can score centroids first and expand only the best n_probe clusters.
+    """
+
+    def __init__(self, dim: int, n_clusters: int = 32):
+        self.dim = dim
+        self.n_clusters = n_clusters
+        self.centroids = np.zeros((0, dim))
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.members: List[List[Hashable]] = []
+        self.stats: List[Dict] = []
+
+    def __len__(self) -> int:
+        return int(self.counts.sum())
+
+    def add(self, key: Hashable, vec: np.ndarray, vad=None, importance: float = 0.0,
+            timestamp: Optional[datetime] = None) -> int:
+        vec = np.asarray(vec, dtype=float)
+        if len(self.centroids) < self.n_clusters:
+            self.centroids = np.vstack([self.centroids, vec])
+            self.counts = np.append(self.counts, 0)
+            self.members.append([])
+            self.stats.append({'vad_mean': np.zeros(3), 'max_importance': 0.0, 'last_seen': None})
+            c = len(self.centroids) - 1
+        else:
+            c = int(np.argmin(((self.centroids - vec) ** 2).sum(axis=1)))
+        self.counts[c] += 1
+        eta = 1.0 / self.counts[c]
+        self.centroids[c] += eta * (vec - self.centroids[c])
+        self.members[c].append(key)
+        stats = self.stats[c]
+        if vad is not None:
+            stats['vad_mean'] += eta * (np.asarray(tuple(vad), dtype=float) - stats['vad_mean'])
+        stats['max_importance'] = max(stats['max_importance'], importance)
+        stats['last_seen'] = timestamp or stats['last_seen']
+        return c
+
+    def probe(self, vec: np.ndarray, n_probe: int = 4) -> List[int]:
+        """Indices of the n_probe centroids nearest to vec (same metric as assignment)."""
+        if not len(self.centroids):
+            return []
+        dists = ((self.centroids - np.asarray(vec, dtype=float)) ** 2).sum(axis=1)
+        n_probe = min(n_probe, len(dists))
+        best = np.argpartition(dists, n_probe - 1)[:n_probe]
+        return [int(c) for c in best[np.argsort(dists[best])]]
+
+    def walk(self, vec: np.ndarray, n_probe: int = 4) -> Iterator[Hashable]:
+        """
+        Member keys of the best clusters, round-robin across them (best
+        cluster first in each round), newest first within a cluster. Lazy, so
+        taking n keys costs O(n) however large the clusters are.
+        """
+        walks = deque(reversed(self.members[c]) for c in self.probe(vec, n_probe))
+        while walks:
+            members = walks.popleft()
+            for key in members:
+                yield key
+                walks.append(members)
+                break
+
+    def search(self, vec: np.ndarray, n_probe: int = 4, n: Optional[int] = None) -> List[Hashable]:
+        """The first n keys of walk() (all of them if n is None)."""
+        return list(islice(self.walk(vec, n_probe), n))
@@ -1,5 +1,6 @@
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
+import numpy as np
 from datetime import datetime
 import uuid
 import logging
@@ -9,6 +10,8 @@ _root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 if _root not in sys.path:
     sys.path.insert(0, _root)
 from src.emotion.analyzer import FullEmotionalAppraisal, LazarusAppraisal
+from src.memory.dedup import SimHashIndex
+from src.memory.clusters import MemoryFeaturizer, OnlineClusters
 
 logger = logging.getLogger('AMN')
 
@@ -26,17 +29,154 @@ class MemoryEntry:
         if self.metadata is None:
             self.metadata = {}
 
+WORKING = 1
+EPISODIC = 2
+
+
+class MemoryStore:
+    """
+    Single backing store for both memory tiers. Each entry is stored once with
+    a tier bitmask (WORKING | EPISODIC), so an entry that is in working memory
+    and the episodic log is never duplicated or scored twice.
+    """
+
+    def __init__(self):
+        self.entries: List[Optional[MemoryEntry]] = []  # chronological, None = dropped
+        self.flags: List[int] = []
+        self._pos: Dict[str, int] = {}
+        self.episodic_log: List[MemoryEntry] = []  # append-only, in EM insertion order
+        self.version = 0  # Bumped on every add/evict; keys retrieval caches
+        self.listeners: List[Any] = []  # incremental indexes: on_add(entry) / on_remove(entry)
+
+    def subscribe(self, listener, backfill: bool = True):
+        """Register an index that is told about every entry added or released."""
+        self.listeners.append(listener)
+        if backfill:
+            for entry in self.entries:
+                if entry is not None:
+                    listener.on_add(entry)
+
+    def get(self, entry_id: str) -> Optional[MemoryEntry]:
+        pos = self._pos.get(entry_id)
+        return None if pos is None else self.entries[pos]
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    def __contains__(self, entry: MemoryEntry) -> bool:
+        return entry.id in self._pos
+
+    def put(self, entry: MemoryEntry, tier: int):
+        pos = self._pos.get(entry.id)
+        if pos is None:
+            self._pos[entry.id] = len(self.entries)
+            self.entries.append(entry)
+            self.flags.append(tier)
+            for listener in self.listeners:
+                listener.on_add(entry)
+        elif self.flags[pos] & tier:
+            return
+        else:
+            self.flags[pos] |= tier
+        if tier == EPISODIC:
+            self.episodic_log.append(entry)
+        self.version += 1
+
+    def drop_tier(self, entry: MemoryEntry, tier: int):
+        pos = self._pos[entry.id]
+        self.flags[pos] &= ~tier
+        if not self.flags[pos]:
+            # In no tier any more: release the row
+            self.entries[pos] = None
+            del self._pos[entry.id]
+            for listener in self.listeners:
+                listener.on_remove(entry)
+        self.version += 1
+
+    def has_tier(self, entry: MemoryEntry, tier: int) -> bool:
+        pos = self._pos.get(entry.id)
+        return pos is not None and bool(self.flags[pos] & tier)
+
+    def touch(self):
+        """Record an in-place update of an entry (invalidates cached results)."""
+        self.version += 1
+
+    def tier_mask(self, mems: List[MemoryEntry], tier: int) -> np.ndarray:
+        """Boolean column marking which of mems belong to tier."""
+        return np.array([
+            entry.id in self._pos and bool(self.flags[self._pos[entry.id]] & tier)
+            for entry in mems
+        ], dtype=bool)
+
+    def get_recent(self, n: int, tier: int = WORKING | EPISODIC) -> List[MemoryEntry]:
+        """Up to n distinct live entries in any of the given tiers, newest first."""
+        out = []
+        for pos in range(len(self.entries) - 1, -1, -1):
+            if len(out) >= n:
+                break
+            if self.flags[pos] & tier:
+                out.append(self.entries[pos])
+        return out
+
+
+class RefCountedListener:
+    """
+    Index adapter for entries shared by several stores (WorkingMemory and
+    EpisodicMemory on separate MemoryStores hold the same entry): forwards an
+    entry's first on_add and only the on_remove that leaves it in no store.
+    """
+
+    def __init__(self, listener):
+        self.listener = listener
+        self._refs: Dict[str, int] = {}
+
+    def on_add(self, entry: MemoryEntry):
+        n = self._refs.get(entry.id, 0)
+        self._refs[entry.id] = n + 1
+        if n == 0:
+            self.listener.on_add(entry)
+
+    def on_remove(self, entry: MemoryEntry):
+        n = self._refs.get(entry.id, 0) - 1
+        if n > 0:
+            self._refs[entry.id] = n
+            return
+        self._refs.pop(entry.id, None)
+        self.listener.on_remove(entry)
+
+
+def subscribe_stores(stores: List[MemoryStore], listener):
+    """
+    Subscribe an index to each distinct store, once. Across more than one
+    store it goes through a RefCountedListener, so evicting an entry from
+    working memory keeps it indexed while the episodic store still holds it.
+    """
+    stores = list({id(store): store for store in stores}.values())
+    target = listener if len(stores) == 1 else RefCountedListener(listener)
+    for store in stores:
+        if not any(l is listener or getattr(l, 'listener', None) is listener for l in store.listeners):
+            store.subscribe(target)
+
+
 class WorkingMemory:
-    def __init__(self, capacity: int = 5):
+    def __init__(self, capacity: int = 5, store: Optional[MemoryStore] = None,
+                 appraiser=None):
         self.capacity = capacity
-        self.memories: List[MemoryEntry] = []
-        self.appraiser = FullEmotionalAppraisal()
+        self.store = store if store is not None else MemoryStore()
+        self.memories: List[MemoryEntry] = []  # newest first, at most capacity
+        # Anything with full_appraisal(text); pass a shared one to skip reloading the lexicon
+        self.appraiser = appraiser if appraiser is not None else FullEmotionalAppraisal()
+
+    @property
+    def version(self) -> int:
+        return self.store.version
 
     def add(self, content: str) -> MemoryEntry:
         appraisal_dict = self.appraiser.full_appraisal(content)
         appraisal = appraisal_dict['lazarus']
         if len(self.memories) >= self.capacity:
             evicted = self.memories.pop()
+            self.store.drop_tier(evicted, WORKING)
             logger.info(f"Evicted: {evicted.id}")
         entry = MemoryEntry(
             id=str(uuid.uuid4()),
@@ -47,6 +187,7 @@ class WorkingMemory:
             importance=1.0 if appraisal_dict['consolidate'] else 0.5
         )
         self.memories.insert(0, entry)
+        self.store.put(entry, WORKING)
         return entry
 
     def _decay_recency(self):
@@ -60,19 +201,68 @@ class WorkingMemory:
         return self.memories
 
 class EpisodicMemory:
-    def __init__(self):
-        self.memories: List[MemoryEntry] = []
+    def __init__(self, store: Optional[MemoryStore] = None, dedup: bool = False,
+                 max_distance: int = 3, n_clusters: int = 0):
+        self.store = store if store is not None else MemoryStore()
+        # Optional near-duplicate collapsing: SimHash within max_distance bits
+        self.dedup = SimHashIndex(max_distance=max_distance) if dedup else None
+        self.merged = 0
+        # Optional online clustering (text + VAD) for coarse-to-fine retrieval
+        self.featurize = MemoryFeaturizer()
+        self.clusters = OnlineClusters(self.featurize.dim, n_clusters) if n_clusters else None
+
+    @property
+    def version(self) -> int:
+        return self.store.version
+
+    @property
+    def memories(self) -> List[MemoryEntry]:
+        # Chronological recent first
+        return self.store.episodic_log[::-1]
+
+    def __len__(self) -> int:
+        return len(self.store.episodic_log)
 
-    def add(self, entry: MemoryEntry):
-        self.memories.insert(0, entry)  # Chronological recent first
+    def add(self, entry: MemoryEntry) -> MemoryEntry:
+        """Store entry, or fold it into a near-duplicate; returns the stored entry."""
+        if self.dedup is not None and not self.store.has_tier(entry, EPISODIC):
+            fp = self.dedup.fingerprint(entry.content)
+            existing = self.store.get(self.dedup.find(fp) or '')
+            if existing is not None:
+                self._merge(existing, entry)
+                return existing
+            self.dedup.add(entry.id, fp)
+        self.store.put(entry, EPISODIC)
+        if self.clusters is not None:
+            vad = entry.appraisal.vad
+            self.clusters.add(entry.id, self.featurize(entry.content, vad), vad=vad,
+                              importance=entry.importance, timestamp=entry.timestamp)
         logger.info(f"Added to EM: {entry.id}")
+        return entry
+
+    def _merge(self, existing: MemoryEntry, entry: MemoryEntry):
+        existing.metadata['count'] = existing.metadata.get('count', 1) + 1
+        existing.importance = max(existing.importance, entry.importance)
+        existing.timestamp = max(existing.timestamp, entry.timestamp)
+        existing.recency_score = max(existing.recency_score, entry.recency_score)
+        self.store.touch()
+        self.merged += 1
+        logger.info(f"Merged into EM: {existing.id} (x{existing.metadata['count']})")
+
+    def added_since(self, n: int) -> List[MemoryEntry]:
+        """Entries added after the first n, oldest first (for incremental indexes)."""
+        return self.store.episodic_log[n:]
 
-    def consolidate(self, entry: MemoryEntry) -> bool:
+    def consolidate(self, entry: MemoryEntry, mood=None) -> bool:
         # Prep for Phase 2: Trigger if arousal>0.7 or goal>0.8
-        if entry.importance > 0.8:  # Stub; full in Day 14
+        salience = entry.importance
+        if mood is not None:
+            # Turns far from the session mood (MoodState before this turn) are salient
+            salience += 0.5 * min(mood.surprise(entry.appraisal.vad) / 3, 1.0)
+        if salience > 0.8:  # Stub; full in Day 14
             logger.info(f"Consolidation trigger: {entry.id}")
             return True
         return False
 
     def get_recent(self, n: int = 50) -> List[MemoryEntry]:
-        return self.memories[:n]
+        return self.store.episodic_log[:-n - 1:-1] if n > 0 else []
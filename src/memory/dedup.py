@@ -0,0 +1,78 @@
+import hashlib
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Hashable, List, Optional
+import numpy as np
+
+TOKEN_RE = re.compile(r"\b\w+\b")
+
+
+def simhash(text: str, bits: int = 64) -> int:
+    """Charikar SimHash over word unigrams and bigrams (stop words kept)."""
+    tokens = TOKEN_RE.findall(text.lower())
+    features = Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+    if not features:
+        return 0
+    hashes = np.array([
+        int.from_bytes(hashlib.blake2b(f.encode('utf-8'), digest_size=bits // 8).digest(), 'big')
+        for f in features
+    ], dtype=np.uint64)
+    weights = np.array(list(features.values()), dtype=float)
+    bit_idx = np.arange(bits, dtype=np.uint64)
+    signs = ((hashes[:, None] >> bit_idx) & np.uint64(1)).astype(float) * 2 - 1
+    acc = weights @ signs
+    return int(sum(1 << i for i in range(bits) if acc[i] > 0))
+
+
+class SimHashIndex:
+    """
+    Near-duplicate lookup by SimHash with banding. The fingerprint is split
+    into `bands` equal chunks; with max_distance < bands, any fingerprint within
+    max_distance bits shares at least one chunk exactly (pigeonhole), so only
+    bucket-mates need a Hamming check.
+    """
+
+    def __init__(self, bits: int = 64, bands: int = 4, max_distance: int = 3):
+        if max_distance >= bands:
+            raise ValueError("max_distance must be < bands for exact banded recall")
+        self.bits = bits
+        self.bands = bands
+        self.max_distance = max_distance
+        self._band_bits = bits // bands
+        self._buckets: List[Dict[int, List[Hashable]]] = [defaultdict(list) for _ in range(bands)]
+        self._fps: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._fps)
+
+    def _band_keys(self, fp: int) -> List[int]:
+        mask = (1 << self._band_bits) - 1
+        return [(fp >> (i * self._band_bits)) & mask for i in range(self.bands)]
+
+    def fingerprint(self, text: str) -> int:
+        return simhash(text, self.bits)
+
+    def find(self, fp: int) -> Optional[Hashable]:
+        """Closest indexed key within max_distance bits of fp, if any."""
+        best, best_dist = None, self.max_distance + 1
+        for band, key in enumerate(self._band_keys(fp)):
+            for other in self._buckets[band].get(key, ()):
+                dist = bin(fp ^ self._fps[other]).count('1')
+                if dist < best_dist:
+                    best, best_dist = other, dist
+        return best
+
+    def add(self, key: Hashable, fp: int):
+        self._fps[key] = fp
+        for band, band_key in enumerate(self._band_keys(fp)):
+            self._buckets[band][band_key].append(key)
+
+    def remove(self, key: Hashable):
+        fp = self._fps.pop(key, None)
+        if fp is None:
+            return
+        for band, band_key in enumerate(self._band_keys(fp)):
+            bucket = self._buckets[band][band_key]
+            bucket.remove(key)
+            if not bucket:
+                del self._buckets[band][band_key]
@@ -0,0 +1,235 @@
+import heapq
+import math
+import pickle
+import numpy as np
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger('AMN')
+
+
+class HNSWIndex:
+    """
+    Pure NumPy Hierarchical Navigable Small World index (Malkov & Yashunin, 2018)
+    for approximate nearest neighbour search over dense memory embeddings.
+
+    Recall/latency are tuned with M (graph degree), ef_construction (build beam)
+    and ef_search (query beam). Deletions are tombstones; call compact() to
+    rebuild once many entries have been removed.
+    """
+
+    def __init__(self, dim: int, M: int = 16, ef_construction: int = 100,
+                 ef_search: int = 50, metric: str = 'cosine', seed: int = 42):
+        if metric not in ('cosine', 'l2'):
+            raise ValueError(f"Unsupported metric: {metric}")
+        self.dim = dim
+        self.M = M
+        self.M0 = 2 * M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.metric = metric
+        self._ml = 1.0 / math.log(max(M, 2))
+        self._rng = np.random.default_rng(seed)
+        self._vectors = np.zeros((1024, dim), dtype=np.float32)
+        self._keys: List[Hashable] = []
+        self._lookup: Dict[Hashable, int] = {}
+        self._graph: List[List[List[int]]] = []  # node -> level -> neighbours
+        self._deleted = set()
+        self._entry: Optional[int] = None
+        self._max_level = -1
+
+    def __len__(self) -> int:
+        return len(self._lookup)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._lookup
+
+    def _prepare(self, vector) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if vec.shape[0] != self.dim:
+            raise ValueError(f"Expected dim {self.dim}, got {vec.shape[0]}")
+        if self.metric == 'cosine':
+            norm = np.linalg.norm(vec)
+            if norm > 0:
+                vec = vec / norm
+        return vec
+
+    def _distances(self, q: np.ndarray, nodes) -> np.ndarray:
+        vecs = self._vectors[nodes]
+        if self.metric == 'cosine':
+            return 1.0 - vecs @ q
+        diff = vecs - q
+        return np.einsum('ij,ij->i', diff, diff)
+
+    def _search_layer(self, q: np.ndarray, entry_points: List[int], ef: int,
+                      level: int) -> List[Tuple[float, int]]:
+        visited = set(entry_points)
+        dists = self._distances(q, entry_points)
+        candidates = [(float(d), n) for d, n in zip(dists, entry_points)]
+        heapq.heapify(candidates)
+        results = [(-d, n) for d, n in candidates]  # max-heap on distance
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+        while candidates:
+            dist, node = heapq.heappop(candidates)
+            if dist > -results[0][0] and len(results) >= ef:
+                break
+            neighbours = [n for n in self._graph[node][level] if n not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+            for d, n in zip(self._distances(q, neighbours), neighbours):
+                d = float(d)
+                if len(results) < ef or d < -results[0][0]:
+                    heapq.heappush(candidates, (d, n))
+                    heapq.heappush(results, (-d, n))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+        return sorted((-d, n) for d, n in results)
+
+    def _greedy_descend(self, q: np.ndarray, target_level: int) -> List[int]:
+        eps = [self._entry]
+        for level in range(self._max_level, target_level, -1):
+            eps = [self._search_layer(q, eps, 1, level)[0][1]]
+        return eps
+
+    def _select_neighbours(self, found: List[Tuple[float, int]], max_degree: int) -> List[int]:
+        # Diversity heuristic (Algorithm 4): skip a candidate that is closer to an
+        # already selected neighbour than to the base node, so clusters stay linked
+        if len(found) <= max_degree:
+            return [n for _, n in found]
+        nodes = [n for _, n in found]
+        base = np.array([d for d, _ in found])
+        vecs = self._vectors[nodes]
+        if self.metric == 'cosine':
+            pair = 1.0 - vecs @ vecs.T
+        else:
+            sq = np.einsum('ij,ij->i', vecs, vecs)
+            pair = sq[:, None] + sq[None, :] - 2 * vecs @ vecs.T
+        # dominated[j] flips once any selected neighbour is closer to j than base
+        dominated = np.zeros(len(nodes), dtype=bool)
+        selected: List[int] = []
+        skipped: List[int] = []
+        for i in range(len(nodes)):
+            if len(selected) >= max_degree:
+                break
+            if dominated[i]:
+                skipped.append(i)
+            else:
+                selected.append(i)
+                dominated |= pair[i] < base
+        chosen = selected + skipped[:max_degree - len(selected)]
+        return [nodes[i] for i in chosen]
+
+    def _prune(self, node: int, level: int, max_degree: int):
+        links = self._graph[node][level]
+        if len(links) <= max_degree:
+            return
+        dists = self._distances(self._vectors[node], links)
+        order = np.argsort(dists)
+        found = [(float(dists[i]), links[i]) for i in order]
+        self._graph[node][level] = self._select_neighbours(found, max_degree)
+
+    def add(self, key: Hashable, vector):
+        """Insert (or replace) a vector under an external key."""
+        if key in self._lookup:
+            self.remove(key)
+        vec = self._prepare(vector)
+        node = len(self._keys)
+        if node >= self._vectors.shape[0]:
+            grown = np.zeros((self._vectors.shape[0] * 2, self.dim), dtype=np.float32)
+            grown[:node] = self._vectors[:node]
+            self._vectors = grown
+        self._vectors[node] = vec
+        self._keys.append(key)
+        self._lookup[key] = node
+        level = int(-math.log(1.0 - self._rng.random()) * self._ml)
+        self._graph.append([[] for _ in range(level + 1)])
+
+        if self._entry is None:
+            self._entry, self._max_level = node, level
+            return
+
+        eps = self._greedy_descend(vec, level)
+        for lvl in range(min(level, self._max_level), -1, -1):
+            found = self._search_layer(vec, eps, self.ef_construction, lvl)
+            max_degree = self.M0 if lvl == 0 else self.M
+            neighbours = self._select_neighbours(found, self.M)
+            self._graph[node][lvl] = neighbours
+            for n in neighbours:
+                self._graph[n][lvl].append(node)
+                self._prune(n, lvl, max_degree)
+            eps = [n for _, n in found]
+
+        if level > self._max_level:
+            self._entry, self._max_level = node, level
+
+    def remove(self, key: Hashable) -> bool:
+        node = self._lookup.pop(key, None)
+        if node is None:
+            return False
+        self._deleted.add(node)
+        return True
+
+    def search(self, vector, k: int = 10, ef: int = None) -> List[Tuple[Hashable, float]]:
+        """Return up to k (key, distance) pairs, nearest first."""
+        if not self._lookup:
+            return []
+        q = self._prepare(vector)
+        ef = max(ef or self.ef_search, k)
+        eps = self._greedy_descend(q, 0)
+        # Widen the beam by the tombstone count so deletions do not starve results
+        found = self._search_layer(q, eps, ef + min(len(self._deleted), ef), 0)
+        hits = [(self._keys[n], d) for d, n in found if n not in self._deleted]
+        return hits[:k]
+
+    def exact_search(self, vector, k: int = 10) -> List[Tuple[Hashable, float]]:
+        """Brute-force reference search, used for recall measurement."""
+        if not self._lookup:
+            return []
+        q = self._prepare(vector)
+        nodes = np.fromiter(self._lookup.values(), dtype=np.int64)
+        dists = self._distances(q, nodes)
+        top = np.argsort(dists)[:k]
+        return [(self._keys[nodes[i]], float(dists[i])) for i in top]
+
+    def compact(self):
+        """Rebuild the graph without tombstoned nodes."""
+        live = [(key, self._vectors[node].copy()) for key, node in self._lookup.items()]
+        self.__init__(self.dim, self.M, self.ef_construction, self.ef_search,
+                      self.metric, seed=int(self._rng.integers(1 << 31)))
+        for key, vec in live:
+            self.add(key, vec)
+        logger.info(f"HNSW compacted: {len(self)} live nodes")
+
+    def save(self, path: str):
+        state = {
+            'params': (self.dim, self.M, self.ef_construction, self.ef_search, self.metric),
+            'vectors': self._vectors[:len(self._keys)],
+            'keys': self._keys,
+            'graph': self._graph,
+            'deleted': self._deleted,
+            'entry': self._entry,
+            'max_level': self._max_level,
+            'rng': self._rng.bit_generator.state,
+        }
+        with open(path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> 'HNSWIndex':
+        with open(path, 'rb') as f:
+            state: Dict[str, Any] = pickle.load(f)
+        index = cls(*state['params'])
+        n = len(state['keys'])
+        index._vectors = np.zeros((max(n, 1024), index.dim), dtype=np.float32)
+        index._vectors[:n] = state['vectors']
+        index._keys = state['keys']
+        index._graph = state['graph']
+        index._deleted = state['deleted']
+        index._lookup = {k: i for i, k in enumerate(index._keys) if i not in index._deleted}
+        index._entry = state['entry']
+        index._max_level = state['max_level']
+        index._rng.bit_generator.state = state['rng']
+        return index
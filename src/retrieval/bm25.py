@@ -0,0 +1,170 @@
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+import numpy as np
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+TOKEN_RE = re.compile(r"\b\w+\b")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in ENGLISH_STOP_WORDS]
+
+
+def _encode_varint(value: int, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_postings(buf: bytearray) -> Iterator[Tuple[int, int]]:
+    # Alternating (doc-id delta, tf) varints
+    doc, value, shift, is_tf = 0, 0, 0, False
+    for byte in buf:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        if is_tf:
+            yield doc, value
+        else:
+            doc += value
+        is_tf = not is_tf
+        value, shift = 0, 0
+
+
+class BM25Index:
+    """
+    Incremental Okapi BM25 inverted index over memory content.
+
+    Postings are varint-compressed (doc-id delta, tf) pairs appended as
+    documents arrive; removal tombstones the doc, updates document
+    frequencies at once and rewrites a posting list only when most of it is
+    dead. Query cost is proportional to the query terms' posting lengths.
+    Plugs into MemoryStore.subscribe() through on_add / on_remove.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, bytearray] = defaultdict(bytearray)
+        self._last_doc: Dict[str, int] = {}
+        self._dead: Dict[str, int] = defaultdict(int)
+        self.df: Dict[str, int] = defaultdict(int)
+        self._doc_ids: Dict[Hashable, int] = {}
+        self._keys: Dict[int, Hashable] = {}
+        self._doc_len: Dict[int, int] = {}
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._next_doc = 0
+        self._total_len = 0
+        self._mutations = 0
+        self._last_query: Optional[tuple] = None  # (query, mutations, scores)
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._doc_ids
+
+    @property
+    def avgdl(self) -> float:
+        return self._total_len / len(self._doc_ids) if self._doc_ids else 0.0
+
+    def add(self, key: Hashable, text: str):
+        if key in self._doc_ids:
+            self.remove(key)
+        tokens = tokenize(text)
+        doc = self._next_doc
+        self._next_doc += 1
+        tf: Dict[str, int] = defaultdict(int)
+        for token in tokens:
+            tf[token] += 1
+        for term, count in tf.items():
+            buf = self._postings[term]
+            _encode_varint(doc - self._last_doc.get(term, 0), buf)
+            _encode_varint(count, buf)
+            self._last_doc[term] = doc
+            self.df[term] += 1
+        self._doc_ids[key] = doc
+        self._keys[doc] = key
+        self._doc_len[doc] = len(tokens)
+        self._doc_terms[doc] = tuple(tf)
+        self._total_len += len(tokens)
+        self._mutations += 1
+
+    def remove(self, key: Hashable) -> bool:
+        doc = self._doc_ids.pop(key, None)
+        if doc is None:
+            return False
+        del self._keys[doc]
+        self._mutations += 1
+        self._total_len -= self._doc_len.pop(doc)
+        for term in self._doc_terms.pop(doc):
+            self.df[term] -= 1
+            self._dead[term] += 1
+            if self.df[term] == 0:
+                for table in (self.df, self._postings, self._last_doc, self._dead):
+                    table.pop(term, None)
+            elif self._dead[term] > self.df[term]:
+                self._rewrite(term)
+        return True
+
+    def _rewrite(self, term: str):
+        buf, prev = bytearray(), 0
+        for doc, tf in _decode_postings(self._postings[term]):
+            if doc in self._keys:
+                _encode_varint(doc - prev, buf)
+                _encode_varint(tf, buf)
+                prev = doc
+        self._postings[term] = buf
+        self._last_doc[term] = prev
+        self._dead[term] = 0
+
+    def on_add(self, entry):
+        self.add(entry.id, entry.content)
+
+    def on_remove(self, entry):
+        self.remove(entry.id)
+
+    def score(self, query: str) -> Dict[Hashable, float]:
+        """Raw BM25 score for every live doc sharing a term with the query."""
+        # Candidate generation and scoring ask for the same query back to back
+        if self._last_query and self._last_query[:2] == (query, self._mutations):
+            return self._last_query[2]
+        scores = self._score(query)
+        self._last_query = (query, self._mutations, scores)
+        return scores
+
+    def _score(self, query: str) -> Dict[Hashable, float]:
+        n = len(self._doc_ids)
+        if not n:
+            return {}
+        avgdl = self.avgdl or 1.0
+        acc: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            df = self.df.get(term)
+            if not df:
+                continue
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for doc, tf in _decode_postings(self._postings[term]):
+                length = self._doc_len.get(doc)
+                if length is None:  # tombstoned
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * length / avgdl)
+                acc[doc] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return {self._keys[doc]: s for doc, s in acc.items()}
+
+    def top_n(self, query: str, n: int) -> List[Tuple[Hashable, float]]:
+        scores = self.score(query)
+        return sorted(scores.items(), key=lambda x: x[1], reverse=True)[:n]
+
+    def normalized_scores(self, query: str, keys: List[Hashable],
+                          scores: Optional[Dict[Hashable, float]] = None) -> np.ndarray:
+        """BM25 for keys scaled by the query's best match, so values lie in [0, 1]."""
+        scores = self.score(query) if scores is None else scores
+        top = max(scores.values(), default=0.0)
+        if top <= 0:
+            return np.zeros(len(keys))
+        return np.array([scores.get(k, 0.0) for k in keys]) / top
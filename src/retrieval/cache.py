@@ -0,0 +1,65 @@
+import hashlib
+from collections import OrderedDict
+from typing import Hashable, Optional
+import numpy as np
+
+
+class RetrievalCache:
+    """
+    Bounded LRU cache of retrieval results. Keys include the memory-store
+    version counters, so any add/evict makes older entries unreachable and
+    a hit always equals a fresh retrieval over the same store state
+    (apart from recency decay accrued since the entry was cached).
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(query: str, query_vad, weights: dict, k: int, version: Hashable,
+                 appraisal=None, query_vec=None) -> tuple:
+        """Everything a result depends on; appraisal and query_vec when the caller supplied them."""
+        q_hash = hashlib.sha1(query.encode('utf-8')).hexdigest()
+        vad = tuple(round(float(x), 6) for x in query_vad)
+        if appraisal is not None:
+            appraisal = tuple(round(float(x), 6) for x in (*appraisal.vad, *appraisal[1:]))
+        if query_vec is not None:
+            query_vec = hashlib.sha1(np.ascontiguousarray(query_vec, dtype=np.float32).tobytes()).hexdigest()
+        return q_hash, vad, appraisal, query_vec, tuple(sorted(weights.items())), k, version
+
+    def get(self, key: tuple) -> Optional[list]:
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return list(value)
+
+    def put(self, key: tuple, value: list):
+        self._data[key] = list(value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def metrics(self) -> dict:
+        return {
+            'result_cache_hits': self.hits,
+            'result_cache_misses': self.misses,
+            'result_cache_hit_ratio': self.hit_ratio,
+            'result_cache_size': len(self),
+        }
@@ -0,0 +1,131 @@
+import math
+from collections import defaultdict
+from itertools import islice
+import numpy as np
+from typing import Callable, Dict, List, Optional
+from src.memory.core import MemoryEntry, EpisodicMemory
+from src.retrieval.ann import HNSWIndex
+from src.retrieval.bm25 import BM25Index
+
+
+class CandidateGenerator:
+    """
+    Stage-1 access path: cheaply proposes memories from the whole episodic
+    store for the weighted scorer to rerank. Generators see each memory once
+    via add_batch() and must answer candidates() without scanning the store.
+    """
+    name = 'base'
+
+    def add_batch(self, mems: List[MemoryEntry]):
+        pass
+
+    def candidates(self, query: str, query_vad, n: int, **features) -> List[MemoryEntry]:
+        raise NotImplementedError
+
+
+class RecencyCandidates(CandidateGenerator):
+    """The old hard-coded window: the n most recent episodic memories."""
+    name = 'recency'
+
+    def __init__(self, em: EpisodicMemory):
+        self.em = em
+
+    def candidates(self, query, query_vad, n, **features):
+        return self.em.get_recent(n)
+
+
+class EmotionCandidates(CandidateGenerator):
+    """
+    Grid over (valence, arousal). Lookups start at the cell the resonance
+    score favours (mirrored valence when the user is in distress) and widen
+    ring by ring until n memories are found, most recent first per cell.
+    """
+    name = 'emotion'
+
+    def __init__(self, cell: float = 0.25):
+        self.cell = cell
+        self.n_v = int(math.ceil(2.0 / cell))
+        self.n_a = int(math.ceil(1.0 / cell))
+        self.cells: Dict[tuple, List[MemoryEntry]] = defaultdict(list)
+
+    def _cell(self, valence: float, arousal: float) -> tuple:
+        v = min(max(int((valence + 1.0) / self.cell), 0), self.n_v - 1)
+        a = min(max(int(arousal / self.cell), 0), self.n_a - 1)
+        return v, a
+
+    def add_batch(self, mems):
+        for mem in mems:
+            vad = mem.appraisal.vad
+            self.cells[self._cell(vad.valence, vad.arousal)].append(mem)
+
+    def candidates(self, query, query_vad, n, **features):
+        if n <= 0:
+            return []
+        target_v = -query_vad.valence if query_vad.valence < -0.2 else query_vad.valence
+        cv, ca = self._cell(target_v, query_vad.arousal)
+        out: List[MemoryEntry] = []
+        for ring in range(max(self.n_v, self.n_a)):
+            for v in range(cv - ring, cv + ring + 1):
+                for a in range(ca - ring, ca + ring + 1):
+                    if max(abs(v - cv), abs(a - ca)) != ring:
+                        continue
+                    bucket = self.cells.get((v, a))
+                    if bucket:
+                        out.extend(reversed(bucket[-(n - len(out)):]))
+                    if len(out) >= n:
+                        return out
+        return out
+
+
+class LexicalCandidates(CandidateGenerator):
+    """Top BM25 matches from the store-wide inverted index."""
+    name = 'lexical'
+
+    def __init__(self, bm25: BM25Index, lookup: Callable[[str], Optional[MemoryEntry]]):
+        self.bm25 = bm25
+        self.lookup = lookup
+
+    def candidates(self, query, query_vad, n, **features):
+        hits = (self.lookup(key) for key, _ in self.bm25.top_n(query, n))
+        return [m for m in hits if m is not None]
+
+
+class AnnCandidates(CandidateGenerator):
+    """Nearest neighbours of the query vector in an HNSW index."""
+    name = 'ann'
+
+    def __init__(self, index: HNSWIndex, encode_batch: Callable[[List[str]], np.ndarray]):
+        self.index = index
+        self.encode_batch = encode_batch
+        self.entries: Dict[str, MemoryEntry] = {}
+
+    def add_batch(self, mems):
+        if not mems:
+            return
+        for mem, vec in zip(mems, self.encode_batch([m.content for m in mems])):
+            self.index.add(mem.id, vec)
+            self.entries[mem.id] = mem
+
+    def candidates(self, query, query_vad, n, query_vec: Optional[np.ndarray] = None, **features):
+        if query_vec is None:
+            return []
+        return [self.entries[key] for key, _ in self.index.search(query_vec, k=n)]
+
+
+class ClusterCandidates(CandidateGenerator):
+    """
+    Coarse-to-fine: score EpisodicMemory's online cluster centroids against the
+    query (text + target VAD, mirrored valence in distress) and expand only
+    the n_probe best clusters. Raising n_probe trades latency for recall.
+    """
+    name = 'cluster'
+
+    def __init__(self, em: EpisodicMemory, n_probe: int = 4):
+        self.em = em
+        self.n_probe = n_probe
+
+    def candidates(self, query, query_vad, n, **features):
+        target = query_vad._replace(valence=-query_vad.valence) if query_vad.valence < -0.2 else query_vad
+        keys = self.em.clusters.walk(self.em.featurize(query, target), self.n_probe)
+        hits = (self.em.store.get(key) for key in keys)
+        return list(islice((m for m in hits if m is not None), n))
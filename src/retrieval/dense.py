@@ -0,0 +1,131 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger('AMN')
+
+
+def quantize_int8(vecs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector int8 quantization: vec ~= q * scale."""
+    vecs = np.atleast_2d(np.asarray(vecs, dtype=np.float32))
+    scales = np.abs(vecs).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    q = np.clip(np.rint(vecs / scales[:, None]), -127, 127).astype(np.int8)
+    return q, scales.astype(np.float32)
+
+
+def dequantize_int8(q: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    return q.astype(np.float32) * np.asarray(scales, dtype=np.float32).reshape(-1, 1)
+
+
+class DenseEncoder:
+    """
+    CPU sentence-transformers encoder for the semantic retrieval component.
+    Embeddings are L2-normalised, int8-quantized with per-vector scales and
+    persisted in a SQLite cache keyed on sha256(model, text), so a memory is
+    embedded once across runs. The cache connection is shared across threads
+    (async agents retrieve on executor threads) behind a lock.
+    """
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2',
+                 cache_path: Optional[str] = 'results/cache/embeddings.sqlite',
+                 batch_size: int = 32, device: str = 'cpu'):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.device = device
+        self._model = None
+        self._vectors: Dict[str, Tuple[np.ndarray, float]] = {}
+        self._db = None
+        self._lock = threading.Lock()
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+            self._db = sqlite3.connect(cache_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, scale REAL, vec BLOB)"
+            )
+        self.hits = 0
+        self.misses = 0
+        self.query_latencies_ms: List[float] = []
+
+    @property
+    def model(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    @property
+    def dim(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode('utf-8')).hexdigest()
+
+    def _load_cached(self, keys: List[str]):
+        missing = [k for k in keys if k not in self._vectors]
+        if not missing or self._db is None:
+            return
+        for i in range(0, len(missing), 500):
+            chunk = missing[i:i + 500]
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT key, scale, vec FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+            for key, scale, blob in rows:
+                self._vectors[key] = (np.frombuffer(blob, dtype=np.int8), scale)
+
+    def encode_quantized(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Embed texts (cache misses only, in batches); returns int8 matrix and scales."""
+        keys = [self._key(t) for t in texts]
+        self._load_cached(keys)
+        todo = {}
+        for key, text in zip(keys, texts):
+            if key in self._vectors or key in todo:
+                self.hits += 1
+            else:
+                self.misses += 1
+                todo[key] = text
+        if todo:
+            embs = self.model.encode(list(todo.values()), batch_size=self.batch_size,
+                                     normalize_embeddings=True, convert_to_numpy=True)
+            q, scales = quantize_int8(embs)
+            rows = []
+            for key, qv, scale in zip(todo, q, scales):
+                self._vectors[key] = (qv, float(scale))
+                rows.append((key, float(scale), qv.tobytes()))
+            if self._db is not None:
+                with self._lock:
+                    self._db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+                    self._db.commit()
+            logger.info(f"Embedded {len(todo)} new texts ({self.hits} cache hits so far)")
+        q = np.stack([self._vectors[k][0] for k in keys]) if keys else np.zeros((0, 0), np.int8)
+        scales = np.array([self._vectors[k][1] for k in keys], dtype=np.float32)
+        return q, scales
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return dequantize_int8(*self.encode_quantized(texts))
+
+    def encode_query(self, text: str) -> np.ndarray:
+        start = time.perf_counter()
+        vec = self.encode([text])[0]
+        self.query_latencies_ms.append((time.perf_counter() - start) * 1000)
+        return vec
+
+    def metrics(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        lat = np.array(self.query_latencies_ms) if self.query_latencies_ms else np.zeros(1)
+        return {
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'cache_hit_rate': self.hits / lookups if lookups else 0.0,
+            'query_latency_ms_mean': float(lat.mean()),
+            'query_latency_ms_p95': float(np.percentile(lat, 95)),
+            'cached_vectors': len(self._vectors),
+        }
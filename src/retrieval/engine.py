@@ -1,13 +1,44 @@
+import time
+from collections import defaultdict
+from dataclasses import dataclass, replace
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-from typing import List, Tuple
-from src.memory.core import MemoryEntry, WorkingMemory, EpisodicMemory
-from src.emotion.analyzer import FullEmotionalAppraisal
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from src.memory.core import MemoryEntry, WorkingMemory, EpisodicMemory, WORKING, EPISODIC, subscribe_stores
+from src.emotion.analyzer import VAD, FullEmotionalAppraisal, LazarusAppraisal, lazarus_from_vad
+from src.emotion.mood import MoodState
+from src.retrieval.ann import HNSWIndex
+from src.retrieval.dense import DenseEncoder
+from src.retrieval.cache import RetrievalCache
+from src.retrieval.bm25 import BM25Index
+from src.retrieval.mmr import mmr_select
+from src.retrieval.graph import AssociativeGraph
+from src.retrieval.planner import QueryPlanner
+from src.retrieval.bm25 import tokenize
+from src.retrieval.candidates import (
+    AnnCandidates, ClusterCandidates, EmotionCandidates, LexicalCandidates, RecencyCandidates
+)
 import logging
 
 logger = logging.getLogger('AMN')
 
+
+@dataclass
+class RetrievalRequest:
+    """
+    A query with everything the caller already computed: its VAD, optionally
+    its LazarusAppraisal, embedding and session MoodState. The engine only
+    fills in what is missing.
+    """
+    query: str
+    vad: VAD
+    appraisal: Optional[LazarusAppraisal] = None
+    query_vec: Optional[np.ndarray] = None
+    mood: Optional[MoodState] = None
+
+
 class RetrievalEngine:
     WEIGHTS = {
         'semantic': 0.25,
@@ -16,14 +47,170 @@ class RetrievalEngine:
         'peak_end': 0.15,
         'recency': 0.10
     }  # Locked totals 1.0
+    COMPONENTS = ('semantic', 'emotional', 'goal', 'peak_end', 'recency')
+    # Additive per-tier score offsets, applied as a column op after weighting
+    TIER_BOOST = {
+        'working': 0.0,
+        'episodic': 0.0
+    }
+
+    # Stage 1 budget per access path; union is capped at max_candidates
+    STAGE_SIZES = {
+        'recency': 50,
+        'emotion': 100,
+        'lexical': 100,
+        'ann': 50,
+        'cluster': 100
+    }
 
-    def __init__(self, wm: WorkingMemory, em: EpisodicMemory, k: int = 5):
+    def __init__(self, wm: WorkingMemory, em: EpisodicMemory, k: int = 5,
+                 index: Optional[HNSWIndex] = None,
+                 encoder: Optional[Callable[[str], np.ndarray]] = None,
+                 index_k: int = 50, dense: Optional[DenseEncoder] = None,
+                 stage_sizes: Optional[Dict[str, int]] = None,
+                 max_candidates: int = 300, cache_size: int = 1024,
+                 weights: Optional[Dict[str, float]] = None,
+                 tier_boost: Optional[Dict[str, float]] = None,
+                 appraiser: Optional[FullEmotionalAppraisal] = None,
+                 semantic: str = 'tfidf', mmr_lambda: Optional[float] = None,
+                 mmr_pool: int = 50, n_probe: int = 4,
+                 graph: Optional[AssociativeGraph] = None, spread_seeds: int = 3,
+                 spread_hops: int = 2, spread_decay: float = 0.5, spread_weight: float = 0.2,
+                 recall_target: Optional[float] = None, mood_weight: float = 0.0):
         self.wm = wm
         self.em = em
         self.k = k
-        self.appraiser = FullEmotionalAppraisal()
+        # Per-instance copy so ablations never mutate the class default
+        self.weights = dict(weights if weights is not None else self.WEIGHTS)
+        self.tier_boost = dict(self.TIER_BOOST, **(tier_boost or {}))
+        # Optional: query appraisal is derived from the caller's VAD unless an
+        # appraiser is supplied to re-appraise the raw text
+        self.appraiser = appraiser
+        # Share of a request's session mood blended into its VAD (0 keeps the
+        # published scoring)
+        self.mood_weight = mood_weight
         self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
         self._fit_vectorizer()
+        # Incremental BM25 over every stored memory; feeds lexical candidates
+        # and, with semantic='bm25', the semantic component
+        if semantic not in ('tfidf', 'bm25'):
+            raise ValueError(f"Unknown semantic scorer: {semantic}")
+        self.semantic = semantic
+        self.bm25 = BM25Index()
+        subscribe_stores([wm.store, em.store], self.bm25)
+        # Optional associative graph: spreading activation from the top hits
+        self.graph = graph
+        self.spread_seeds = spread_seeds
+        self.spread_hops = spread_hops
+        self.spread_decay = spread_decay
+        self.spread_weight = spread_weight
+        if graph is not None:
+            subscribe_stores([wm.store, em.store], graph)
+        # Optional dense scorer: replaces TF-IDF/BM25 for the semantic component
+        self.dense = dense
+        self._dense_vecs = {}  # memory id -> (int8 vector, scale)
+        self.encoder = encoder or self._tfidf_encode
+        # Two-stage retrieval: generators propose candidates from the whole
+        # episodic store, the weighted scorer reranks only those
+        self.stage_sizes = dict(self.STAGE_SIZES, **(stage_sizes or {}))
+        self.max_candidates = max_candidates
+        self.generators = [
+            RecencyCandidates(em),
+            EmotionCandidates(),
+            LexicalCandidates(self.bm25, self._lookup),
+        ]
+        # Centroid-first expansion when EpisodicMemory keeps clusters
+        if getattr(em, 'clusters', None) is not None:
+            self.generators.append(ClusterCandidates(em, n_probe=n_probe))
+        # Optional ANN index over the full episodic history
+        self.index = index
+        if index is not None:
+            self.stage_sizes['ann'] = index_k
+            self.generators.append(AnnCandidates(index, self._encode_batch))
+        self._n_synced = 0
+        # Per-stage [total ms, calls]: constant memory however long the run
+        self.stage_latency_ms = defaultdict(lambda: [0.0, 0])
+        self.cache = RetrievalCache(cache_size) if cache_size else None
+        # Optional MMR diversity rerank of the top mmr_pool scored memories;
+        # None disables, 1.0 is pure relevance
+        self.mmr_lambda = mmr_lambda
+        self.mmr_pool = mmr_pool
+        self._mmr_hasher = HashingVectorizer(n_features=2 ** 12, alternate_sign=False, norm='l2')
+        self._mmr_vecs = {}  # memory id -> sparse row, hashed once per memory
+        # Optional cost-based planner: per query, full scan or a subset of
+        # the candidate paths, whichever is cheapest at recall_target
+        self.recall_target = recall_target
+        self.planner = QueryPlanner(recall_target) if recall_target is not None else None
+
+    @property
+    def version(self) -> tuple:
+        return self.wm.version, self.em.version
+
+    def _lookup(self, entry_id: str) -> Optional[MemoryEntry]:
+        return self.wm.store.get(entry_id) or self.em.store.get(entry_id)
+
+    def _tfidf_encode(self, text: str) -> np.ndarray:
+        return self.vectorizer.transform([text]).toarray()[0]
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        if self.dense is not None:
+            return self.dense.encode(texts)
+        return np.stack([self.encoder(t) for t in texts])
+
+    def _sync_generators(self):
+        # The episodic log is append-only, so only the tail is unseen
+        new = self.em.added_since(self._n_synced)
+        if not new:
+            return
+        for gen in self.generators:
+            gen.add_batch(new)
+        self._n_synced += len(new)
+
+    def _generate_candidates(self, query: str, query_vad, paths: Optional[Tuple[str, ...]] = None,
+                             **features) -> List[MemoryEntry]:
+        self._sync_generators()
+        # Working memory is always a candidate; then each path fills its budget.
+        # Keyed by id so an entry in both tiers is scored once
+        pool = {m.id: m for m in self.wm.get_all()}
+        for gen in self.generators:
+            if paths is not None and gen.name not in paths:
+                continue
+            start = time.perf_counter()
+            for mem in gen.candidates(query, query_vad, self.stage_sizes.get(gen.name, 0), **features):
+                if len(pool) >= self.max_candidates:
+                    break
+                pool.setdefault(mem.id, mem)
+            self._record_path(gen.name, (time.perf_counter() - start) * 1000)
+        return list(pool.values())
+
+    def _record_stage(self, stage: str, ms: float):
+        totals = self.stage_latency_ms[stage]
+        totals[0] += ms
+        totals[1] += 1
+
+    def _record_path(self, name: str, ms: float):
+        self._record_stage(f'candidates_{name}', ms)
+        if self.planner is not None:
+            self.planner.observe_path(name, ms)
+
+    def _path_estimates(self, query: str) -> Dict[str, int]:
+        # Expected candidates per path; lexical is bounded by the query
+        # terms' document frequencies, the others fill their budget
+        n_em = len(self.em)
+        est = {gen.name: min(self.stage_sizes.get(gen.name, 0), n_em) for gen in self.generators}
+        if 'lexical' in est:
+            est['lexical'] = min(est['lexical'], sum(self.bm25.df.get(t, 0) for t in set(tokenize(query))))
+        return est
+
+    def _sync_dense(self, mems: List[MemoryEntry]):
+        # Embed every not-yet-seen memory in one batch; the encoder's on-disk
+        # cache makes this a lookup for content embedded in earlier runs
+        new = [m for m in mems if m.id not in self._dense_vecs]
+        if not new:
+            return
+        q, scales = self.dense.encode_quantized([m.content for m in new])
+        for mem, qv, scale in zip(new, q, scales):
+            self._dense_vecs[mem.id] = (qv, scale)
 
     def _fit_vectorizer(self):
         dummy_texts = ["happy sad angry fear excited calm project work friend family"]
@@ -34,6 +221,27 @@ class RetrievalEngine:
         e_vec = self.vectorizer.transform([entry.content])
         return cosine_similarity(q_vec, e_vec)[0][0]
 
+    def _semantic_scores(self, query: str, mems: List[MemoryEntry], q_dense=None) -> np.ndarray:
+        if self.dense is not None:
+            self._sync_dense(mems)
+            q8 = np.stack([self._dense_vecs[m.id][0] for m in mems])
+            scales = np.array([self._dense_vecs[m.id][1] for m in mems], dtype=np.float32)
+            return scales * (q8 @ q_dense)
+        if self.semantic == 'bm25':
+            return self.bm25.normalized_scores(query, [m.id for m in mems])
+        q_vec = self.vectorizer.transform([query])
+        e_vecs = self.vectorizer.transform([m.content for m in mems])
+        return cosine_similarity(q_vec, e_vecs)[0]
+
+    def _emotional_resonance_vec(self, query_vad, vads: np.ndarray) -> np.ndarray:
+        # Column form of _emotional_resonance over an (n x 3) VAD array
+        if query_vad.valence < -0.2:
+            valence_sim = 1 - np.abs(query_vad.valence + vads[:, 0])
+        else:
+            valence_sim = 1 - np.abs(query_vad.valence - vads[:, 0])
+        arousal_sim = 1 - 0.5 * np.abs(query_vad.arousal - vads[:, 1])
+        return 0.5 * valence_sim + 0.5 * arousal_sim
+
     def _emotional_resonance(self, query_vad, memory_vad) -> float:
         """
         Implements complementary retrieval for therapeutic reframing (paper Section 3.3)
@@ -53,34 +261,327 @@ class RetrievalEngine:
         agency_align = 1 - abs(query_appraisal.agency - entry_appraisal.agency)
         return (goal_sim + agency_align) / 2
 
-    def retrieve(self, query: str, query_vad: 'VAD') -> List[Tuple[MemoryEntry, float]]:
-        all_mems = self.wm.get_all() + self.em.get_recent(50)
-        if not all_mems:
-            return []
+    def _as_request(self, query: Union[str, RetrievalRequest],
+                    query_vad: Optional[VAD] = None) -> RetrievalRequest:
+        req = query if isinstance(query, RetrievalRequest) else RetrievalRequest(query, query_vad)
+        if req.appraisal is None:
+            if self.appraiser is not None:
+                appraisal = self.appraiser.full_appraisal(req.query)['lazarus']
+            else:
+                appraisal = lazarus_from_vad(req.vad)
+            req = replace(req, appraisal=appraisal)
+        if req.mood is not None and req.mood.turns and self.mood_weight:
+            # Emotional scoring and candidates follow the session mood as well
+            # as the current turn; the appraisal stays that of the turn
+            w = self.mood_weight
+            req = replace(req, vad=VAD(*((1 - w) * q + w * m for q, m in zip(req.vad, req.mood.mean))),
+                          mood=None)
+        return req
+
+    def retrieve(self, query: Union[str, RetrievalRequest],
+                 query_vad: Optional[VAD] = None) -> List[Tuple[MemoryEntry, float]]:
+        """Top-k memories for a query string + VAD, or for a RetrievalRequest."""
+        req = self._as_request(query, query_vad)
+        if self.cache is not None:
+            weights = dict(self.weights, **{f'tier_{t}': b for t, b in self.tier_boost.items()},
+                           mmr=(self.mmr_lambda, self.mmr_pool),
+                           spread=None if self.graph is None else
+                           (self.spread_seeds, self.spread_hops, self.spread_decay, self.spread_weight),
+                           recall_target=self.recall_target)
+            key = RetrievalCache.make_key(req.query, req.vad, weights, self.k, self.version,
+                                          appraisal=req.appraisal, query_vec=req.query_vec)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            top_k = self._retrieve(req)
+            self.cache.put(key, top_k)
+            return top_k
+        return self._retrieve(req)
 
-        # Compute full appraisal for query
-        query_appraisal_dict = self.appraiser.full_appraisal(query)
-        query_appraisal = query_appraisal_dict['lazarus']
+    def weight_vector(self, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        weights = self.weights if weights is None else weights
+        return np.array([weights.get(c, 0.0) for c in self.COMPONENTS])
 
-        scores = []
-        for mem in all_mems:
-            sem = self._semantic_score(query, mem)
-            # Use mem.appraisal.vad for emotional resonance
-            emo = self._emotional_resonance(query_vad, mem.appraisal.vad)
+    def _query_dense(self, req: RetrievalRequest) -> Optional[np.ndarray]:
+        if self.dense is None:
+            return None
+        return req.query_vec if req.query_vec is not None else self.dense.encode_query(req.query)
+
+    def _index_query_vec(self, req: RetrievalRequest, q_dense=None) -> Optional[np.ndarray]:
+        if self.index is None:
+            return None
+        q_vec = q_dense if q_dense is not None else req.query_vec
+        return q_vec if q_vec is not None else self.encoder(req.query)
+
+    def _stage1(self, req: RetrievalRequest):
+        start = time.perf_counter()
+        q_dense = self._query_dense(req)
+        if self.planner is not None:
+            self._sync_generators()
+            plan = self.planner.plan(req.query, req.vad, self._path_estimates(req.query),
+                                     self._n_distinct(), len(self.wm.memories),
+                                     self.max_candidates)
+            if plan.scan:
+                mems = self.snapshot()
+            else:
+                mems = self._generate_candidates(req.query, req.vad, plan.paths,
+                                                 query_vec=self._index_query_vec(req, q_dense))
+        else:
+            mems = self._generate_candidates(req.query, req.vad,
+                                             query_vec=self._index_query_vec(req, q_dense))
+        self._record_stage('stage1', (time.perf_counter() - start) * 1000)
+        return mems, q_dense
+
+    def _component_matrix(self, req: RetrievalRequest, mems: List[MemoryEntry],
+                          q_dense=None) -> np.ndarray:
+        vads = np.array([tuple(m.appraisal.vad) for m in mems], dtype=float)
+        goals = np.array([m.appraisal.goal_relevance for m in mems], dtype=float)
+        return np.column_stack([
+            self._semantic_scores(req.query, mems, q_dense),
+            self._emotional_resonance_vec(req.vad, vads),
             # Use goal_relevance as proxy for goal alignment
-            goal = 1 - abs(query_appraisal.goal_relevance - mem.appraisal.goal_relevance)
-            peak = mem.importance
-            rec = mem.recency_score
-            total = (
-                self.WEIGHTS['semantic'] * sem +
-                self.WEIGHTS['emotional'] * emo +
-                self.WEIGHTS['goal'] * goal +
-                self.WEIGHTS['peak_end'] * peak +
-                self.WEIGHTS['recency'] * rec
-            )
-            scores.append((mem, total))
-
-        top_k = sorted(scores, key=lambda x: x[1], reverse=True)[:self.k]
+            1 - np.abs(req.appraisal.goal_relevance - goals),
+            [m.importance for m in mems],
+            [m.recency_score for m in mems],
+        ])
+
+    def score_components(self, query: Union[str, RetrievalRequest],
+                         query_vad: Optional[VAD] = None,
+                         mems: Optional[List[MemoryEntry]] = None
+                         ) -> Tuple[List[MemoryEntry], np.ndarray]:
+        """
+        Unweighted (n_memories x 5) component matrix, columns ordered as
+        COMPONENTS. Any weight vector w gives totals via matrix @ w.
+        Candidates come from stage 1 unless mems is given.
+        """
+        return self._score_components(self._as_request(query, query_vad), mems)
+
+    def _score_components(self, req: RetrievalRequest, mems: Optional[List[MemoryEntry]] = None):
+        planned = mems is None and self.planner is not None
+        t0 = time.perf_counter()
+        if mems is None:
+            mems, q_dense = self._stage1(req)
+        else:
+            q_dense = self._query_dense(req)
+        if not mems:
+            return [], np.zeros((0, len(self.COMPONENTS)))
+        start = time.perf_counter()
+        components = self._component_matrix(req, mems, q_dense)
+        end = time.perf_counter()
+        self._record_stage('stage2', (end - start) * 1000)
+        if planned:
+            self.planner.observe_rows((end - start) * 1000, len(mems))
+            self.planner.finish((end - t0) * 1000, len(mems))
+            if self.planner.last.scan:
+                self._calibrate(req, mems, components, q_dense)
+        return mems, components
+
+    def _calibrate(self, req: RetrievalRequest, mems: List[MemoryEntry], components: np.ndarray,
+                   q_dense=None):
+        # A scan yields the exact top-k; score every path subset against it.
+        # Working memory is in every plan, so only episodic hits count
+        totals = components @ self.weight_vector() + self._tier_bonus(mems)
+        wm_ids = {m.id for m in self.wm.get_all()}
+        truth = {mems[i].id for i in self._row_top_k(totals, self.k)} - wm_ids
+        q_vec = self._index_query_vec(req, q_dense)
+        found = {}
+        for gen in self.generators:
+            start = time.perf_counter()
+            hits = gen.candidates(req.query, req.vad, self.stage_sizes.get(gen.name, 0), query_vec=q_vec)
+            self._record_path(gen.name, (time.perf_counter() - start) * 1000)
+            found[gen.name] = {m.id for m in hits}
+        self.planner.observe_recall(self.planner.last.bucket, truth, found)
+
+    def explain(self, query: Optional[Union[str, RetrievalRequest]] = None,
+                query_vad: Optional[VAD] = None) -> str:
+        """
+        Planner report: the chosen plan, its estimated versus actual cost and
+        the cheapest rejected alternatives. Runs query (bypassing the cache)
+        when given, otherwise describes the last planned query.
+        """
+        if self.planner is None:
+            return 'planner disabled (recall_target=None)'
+        if query is not None:
+            self._retrieve(self._as_request(query, query_vad))
+        return self.planner.explain()
+
+    def _tier_bonus(self, mems: List[MemoryEntry]) -> np.ndarray:
+        bonus = np.zeros(len(mems))
+        if self.tier_boost.get('working'):
+            bonus += self.tier_boost['working'] * self.wm.store.tier_mask(mems, WORKING)
+        if self.tier_boost.get('episodic'):
+            bonus += self.tier_boost['episodic'] * self.em.store.tier_mask(mems, EPISODIC)
+        return bonus
+
+    def _mmr_vectors(self, mems: List[MemoryEntry]):
+        # Dense embeddings when available, else hashed bag-of-words (stop words
+        # kept: near-duplicate turns are often nothing but stop words)
+        if self.dense is not None:
+            self._sync_dense(mems)
+            vecs = np.stack([self._dense_vecs[m.id][0] for m in mems]).astype(np.float32)
+            norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+            return vecs / np.where(norms > 0, norms, 1)
+        new = [m for m in mems if m.id not in self._mmr_vecs]
+        if new:
+            for mem, row in zip(new, self._mmr_hasher.transform([m.content for m in new])):
+                self._mmr_vecs[mem.id] = row
+        return sparse.vstack([self._mmr_vecs[m.id] for m in mems]).tocsr()
+
+    def _select(self, mems: List[MemoryEntry], totals: np.ndarray) -> List[Tuple[MemoryEntry, float]]:
+        # Relevance top-k, or MMR over the best mmr_pool when diversity is on
+        if self.mmr_lambda is None:
+            return [(mems[i], float(totals[i])) for i in self._row_top_k(totals, self.k)]
+        pool = self._row_top_k(totals, max(self.mmr_pool, self.k))
+        picked = mmr_select(self._mmr_vectors([mems[i] for i in pool]), totals[pool],
+                            self.k, self.mmr_lambda)
+        return [(mems[pool[j]], float(totals[pool[j]])) for j in picked]
+
+    def retrieve_multi(self, query: Union[str, RetrievalRequest], query_vad: Optional[VAD] = None,
+                       weight_configs: Optional[Dict[str, Dict[str, float]]] = None
+                       ) -> Dict[str, List[Tuple[MemoryEntry, float]]]:
+        """
+        Top-k for every weight configuration from one component computation.
+        With a graph, activation spreads per configuration (from its own
+        seeds), so each ranking matches retrieve() under those weights.
+        """
+        weight_configs = weight_configs or {'default': self.weights}
+        req = self._as_request(query, query_vad)
+        mems, components = self._score_components(req)
+        names = list(weight_configs)
+        W = np.column_stack([self.weight_vector(weight_configs[n]) for n in names])
+        totals = components @ W + self._tier_bonus(mems)[:, None]  # (n_memories x n_configs)
+        out = {}
+        for j, n in enumerate(names):
+            ranked, column = mems, totals[:, j]
+            if self.graph is not None and mems:
+                ranked, column = self._spread(req, mems, column, W[:, j])
+            out[n] = self._select(ranked, column)
+        return out
+
+    def _retrieve(self, req: RetrievalRequest) -> List[Tuple[MemoryEntry, float]]:
+        mems, components = self._score_components(req)
+        if not mems:
+            return []
+        totals = components @ self.weight_vector() + self._tier_bonus(mems)
+        if self.graph is not None:
+            mems, totals = self._spread(req, mems, totals)
+        top_k = self._select(mems, totals)
         if top_k:
             logger.info(f"Retrieved top-1: {top_k[0][0].id} score={top_k[0][1]:.3f}")
         return top_k
+
+    def _spread(self, req: RetrievalRequest, mems: List[MemoryEntry], totals: np.ndarray,
+                w: Optional[np.ndarray] = None):
+        # Seeds are the best scored memories; activation flows over cached
+        # graph edges and is added as a max-normalised bonus. Memories reached outside the
+        # candidate pool are scored on their own - a handful, not a scan
+        start = time.perf_counter()
+        seeds = {mems[i].id: float(totals[i]) for i in self._row_top_k(totals, self.spread_seeds)}
+        activation = self.graph.spread(seeds, self.spread_hops, self.spread_decay)
+        if activation:
+            pos = {m.id: i for i, m in enumerate(mems)}
+            reached = [m for m in map(self._lookup, activation) if m is not None and m.id not in pos]
+            if reached:
+                extra = self._component_matrix(req, reached, self._query_dense(req))
+                mems = mems + reached
+                w = self.weight_vector() if w is None else w
+                totals = np.concatenate([totals, extra @ w + self._tier_bonus(reached)])
+            bonus = np.array([activation.get(m.id, 0.0) for m in mems])
+            totals = totals + self.spread_weight * bonus / bonus.max()
+        self._record_stage('spread', (time.perf_counter() - start) * 1000)
+        return mems, totals
+
+    def _n_distinct(self) -> int:
+        """Distinct live memories (working-memory turns are also in the episodic log)."""
+        if self.wm.store is self.em.store:
+            return len(self.em.store)
+        return len(self.wm.store) + len(self.em.store)
+
+    def snapshot(self) -> List[MemoryEntry]:
+        """Every distinct live memory across both tiers, newest first."""
+        return list({m.id: m for m in self.wm.get_all() + self.em.memories}.values())
+
+    @staticmethod
+    def _row_top_k(row: np.ndarray, k: int) -> np.ndarray:
+        # argpartition for the cut, then a stable sort of the survivors; ties
+        # at the cut go to the lowest index, matching a full stable argsort
+        n = len(row)
+        if k >= n:
+            return np.argsort(-row, kind='stable')
+        thr = np.partition(row, n - k)[n - k]
+        above = np.flatnonzero(row > thr)
+        ties = np.flatnonzero(row == thr)[:k - len(above)]
+        idx = np.concatenate([above, ties])
+        return idx[np.argsort(-row[idx], kind='stable')]
+
+    def retrieve_batch(self, queries: List[Union[str, RetrievalRequest]],
+                       vads: Optional[List[VAD]] = None,
+                       mems: Optional[List[MemoryEntry]] = None,
+                       chunk_size: Optional[int] = None,
+                       max_cells: int = 1 << 22) -> List[List[Tuple[MemoryEntry, float]]]:
+        """
+        Score Q queries against a fixed memory snapshot (default: all memories)
+        as a (Q x N) matrix and return per-query top-k. Queries are processed
+        chunk_size rows at a time; by default the chunk is sized so a block
+        holds at most max_cells scores, bounding peak memory for large Q x N.
+        """
+        vads = vads if vads is not None else [None] * len(queries)
+        reqs = [self._as_request(q, v) for q, v in zip(queries, vads)]
+        mems = self.snapshot() if mems is None else mems
+        if not reqs or not mems:
+            return [[] for _ in reqs]
+        n = len(mems)
+        chunk_size = chunk_size or max(1, max_cells // n)
+
+        # Memory-side columns are computed once per snapshot
+        vad_cols = np.array([tuple(m.appraisal.vad) for m in mems], dtype=float)
+        goal_col = np.array([m.appraisal.goal_relevance for m in mems], dtype=float)
+        w = self.weight_vector()
+        static = (w[3] * np.array([m.importance for m in mems], dtype=float) +
+                  w[4] * np.array([m.recency_score for m in mems], dtype=float) +
+                  self._tier_bonus(mems))
+        if self.dense is not None:
+            self._sync_dense(mems)
+            mem_sem = np.stack([self._dense_vecs[m.id][0] for m in mems]).astype(np.float32)
+            mem_sem *= np.array([self._dense_vecs[m.id][1] for m in mems], dtype=np.float32)[:, None]
+        elif self.semantic == 'bm25':
+            mem_sem = [m.id for m in mems]
+        else:
+            mem_sem = self.vectorizer.transform([m.content for m in mems])
+
+        results = []
+        for start in range(0, len(reqs), chunk_size):
+            block = reqs[start:start + chunk_size]
+            if self.dense is not None:
+                todo = [r.query for r in block if r.query_vec is None]
+                encoded = iter(self.dense.encode(todo)) if todo else iter(())
+                q_sem = np.stack([r.query_vec if r.query_vec is not None else next(encoded)
+                                  for r in block])
+                sem = q_sem @ mem_sem.T
+            elif self.semantic == 'bm25':
+                sem = np.stack([self.bm25.normalized_scores(r.query, mem_sem) for r in block])
+            else:
+                sem = cosine_similarity(self.vectorizer.transform([r.query for r in block]), mem_sem)
+            qv = np.array([r.vad.valence for r in block], dtype=float)[:, None]
+            qa = np.array([r.vad.arousal for r in block], dtype=float)[:, None]
+            qg = np.array([r.appraisal.goal_relevance for r in block], dtype=float)[:, None]
+            # Complementary valence per row when that query is in distress
+            valence_sim = 1 - np.abs(np.where(qv < -0.2, qv + vad_cols[:, 0], qv - vad_cols[:, 0]))
+            arousal_sim = 1 - 0.5 * np.abs(qa - vad_cols[:, 1])
+            totals = (w[0] * sem +
+                      w[1] * (0.5 * valence_sim + 0.5 * arousal_sim) +
+                      w[2] * (1 - np.abs(qg - goal_col)) +
+                      static)
+            for row in totals:
+                results.append(self._select(mems, row))
+        return results
+
+    def metrics(self) -> dict:
+        out = {f'{stage}_ms_mean': total / n for stage, (total, n) in self.stage_latency_ms.items() if n}
+        if self.dense is not None:
+            out.update(self.dense.metrics())
+        if self.cache is not None:
+            out.update(self.cache.metrics())
+        if self.planner is not None:
+            out.update(self.planner.metrics())
+        return out
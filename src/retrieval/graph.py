@@ -0,0 +1,78 @@
+from collections import defaultdict
+from typing import Dict, Hashable, Optional
+from src.memory.clusters import MemoryFeaturizer
+from src.retrieval.ann import HNSWIndex
+
+
+class AssociativeGraph:
+    """
+    Sparse k-nearest-neighbour graph between stored memories, maintained on
+    insert through MemoryStore.subscribe(). Each new memory is linked to its
+    k most similar predecessors (found through an internal HNSW index, not a
+    scan) and to the memory stored just before it, so turns from the same
+    exchange stay associated. spread() runs decaying activation over the
+    cached edges from a few seed memories.
+    """
+
+    def __init__(self, k: int = 8, min_sim: float = 0.2, temporal_weight: float = 0.5,
+                 featurizer: Optional[MemoryFeaturizer] = None):
+        self.k = k
+        self.min_sim = min_sim
+        self.temporal_weight = temporal_weight
+        self.featurize = featurizer or MemoryFeaturizer(vad_weight=0.25)
+        self.index = HNSWIndex(self.featurize.dim, M=8, ef_construction=64)
+        self.edges: Dict[Hashable, Dict[Hashable, float]] = defaultdict(dict)
+        self._last: Optional[Hashable] = None
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _link(self, a: Hashable, b: Hashable, weight: float):
+        for src, dst in ((a, b), (b, a)):
+            links = self.edges[src]
+            links[dst] = max(links.get(dst, 0.0), weight)
+            if len(links) > self.k + 1:  # k similarity edges + 1 temporal edge
+                weakest = min(links, key=links.get)
+                del links[weakest]
+                self.edges[weakest].pop(src, None)
+
+    def on_add(self, entry):
+        vec = self.featurize(entry.content, entry.appraisal.vad)
+        for key, dist in self.index.search(vec, k=self.k):
+            sim = 1.0 - dist
+            if sim >= self.min_sim:
+                self._link(entry.id, key, sim)
+        if self._last is not None and self._last in self.index:
+            self._link(entry.id, self._last, self.temporal_weight)
+        self.index.add(entry.id, vec)
+        self._last = entry.id
+
+    def on_remove(self, entry):
+        self.index.remove(entry.id)
+        for other in self.edges.pop(entry.id, {}):
+            self.edges[other].pop(entry.id, None)
+        if self._last == entry.id:
+            self._last = None
+
+    def spread(self, seeds: Dict[Hashable, float], hops: int = 2, decay: float = 0.5,
+               threshold: float = 0.05) -> Dict[Hashable, float]:
+        """
+        Activation reached by non-seed memories: each hop passes
+        activation * decay * edge weight to neighbours. Cost is the number of
+        edges touched, independent of store size.
+        """
+        activation: Dict[Hashable, float] = defaultdict(float)
+        frontier = dict(seeds)
+        for _ in range(hops):
+            nxt: Dict[Hashable, float] = defaultdict(float)
+            for node, act in frontier.items():
+                for nbr, weight in self.edges.get(node, {}).items():
+                    if nbr in seeds:
+                        continue
+                    nxt[nbr] += act * decay * weight
+            frontier = {n: a for n, a in nxt.items() if a >= threshold}
+            for node, act in frontier.items():
+                activation[node] += act
+            if not frontier:
+                break
+        return dict(activation)
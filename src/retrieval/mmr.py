@@ -0,0 +1,27 @@
+import numpy as np
+from typing import List
+
+
+def mmr_select(vectors, relevance: np.ndarray, k: int, lam: float = 0.7) -> List[int]:
+    """
+    Maximal marginal relevance (Carbonell & Goldstein, 1998) over L2-normalised
+    rows of `vectors` (dense ndarray or scipy sparse). Keeps a running
+    max-similarity-to-selected array, so each pick costs one (n,) product:
+    O(k x n) overall instead of pairwise loops. Returns indices in pick order.
+    """
+    n = len(relevance)
+    k = min(k, n)
+    max_sim = np.zeros(n)
+    available = np.ones(n, dtype=bool)
+    picked: List[int] = []
+    for _ in range(k):
+        mmr = lam * relevance - (1 - lam) * max_sim
+        mmr[~available] = -np.inf
+        j = int(np.argmax(mmr))
+        picked.append(j)
+        available[j] = False
+        sims = vectors @ vectors[j].T
+        if hasattr(sims, 'toarray'):
+            sims = sims.toarray()
+        max_sim = np.maximum(max_sim, np.asarray(sims).reshape(-1))
+    return picked
@@ -0,0 +1,158 @@
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+TIME_RE = re.compile(r"\b(yesterday|today|tonight|earlier|recently|lately|ago|last|"
+                     r"morning|afternoon|evening|week|weekend|month|just)\b", re.I)
+
+
+@dataclass
+class QueryPlan:
+    """One stage-1 plan: a full scan, or the union of some candidate paths."""
+    paths: Tuple[str, ...]  # empty for a full scan
+    bucket: tuple
+    est_ms: float
+    est_recall: float
+    est_rows: int
+    reason: str = ''
+    actual_ms: Optional[float] = None
+    actual_rows: Optional[int] = None
+    alternatives: List[tuple] = field(default_factory=list)  # (label, est_ms, est_recall)
+
+    @property
+    def scan(self) -> bool:
+        return not self.paths
+
+    @property
+    def label(self) -> str:
+        return 'scan' if self.scan else '+'.join(self.paths)
+
+
+class QueryPlanner:
+    """
+    Cost-based choice between scoring every memory and scoring only the union
+    of some candidate paths. Queries are bucketed by (distress, time words,
+    strong VAD); per bucket the planner keeps an EWMA of the recall each path
+    subset achieved against the exact top-k, measured whenever a full scan
+    runs. Costs come from measured per-path latency plus a decayed
+    least-squares fit of stage-2 latency as fixed + per-row cost. The cheapest plan whose estimated recall meets recall_target wins;
+    until a subset has min_samples observations only the scan qualifies, and
+    every calibrate_every-th query scans anyway to keep estimates fresh.
+    """
+
+    def __init__(self, recall_target: float = 0.9, alpha: float = 0.2,
+                 min_samples: int = 5, calibrate_every: int = 20):
+        self.recall_target = recall_target
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.calibrate_every = calibrate_every
+        self.path_ms: Dict[str, float] = {}
+        self._fit = [0.0] * 5  # decayed sums: n, rows, ms, rows^2, rows*ms
+        self.recall: Dict[tuple, Dict[FrozenSet[str], List[float]]] = defaultdict(dict)  # [ewma, n]
+        self.n_queries = 0
+        self.plan_counts: Dict[str, int] = defaultdict(int)
+        self.last: Optional[QueryPlan] = None
+
+    def _ewma(self, old: Optional[float], new: float) -> float:
+        return new if old is None else old + self.alpha * (new - old)
+
+    @staticmethod
+    def features(query: str, query_vad) -> tuple:
+        distress = query_vad.valence < -0.2
+        time_words = bool(TIME_RE.search(query))
+        strong = (query_vad.valence ** 2 + query_vad.arousal ** 2) ** 0.5 > 0.7
+        return distress, time_words, strong
+
+    def plan(self, query: str, query_vad, estimates: Dict[str, int], n_total: int,
+             n_fixed: int = 0, max_rows: Optional[int] = None) -> QueryPlan:
+        """
+        estimates maps each available path to its expected candidate count;
+        n_fixed rows (working memory) are scored by every plan.
+        """
+        self.n_queries += 1
+        bucket = self.features(query, query_vad)
+        scan = QueryPlan((), bucket, self.row_cost(n_total), 1.0, n_total)
+        options = [scan]
+        if self.calibrate_every and self.n_queries % self.calibrate_every == 0:
+            scan.reason = 'calibration'
+        else:
+            scan.reason = 'no index plan meets recall target'
+            for subset, (recall, n) in self.recall[bucket].items():
+                if n < self.min_samples or not subset <= estimates.keys():
+                    continue
+                rows = n_fixed + sum(estimates[p] for p in subset)
+                rows = min(rows, max_rows or rows, n_total)
+                est_ms = sum(self.path_ms.get(p, 0.0) for p in subset) + self.row_cost(rows)
+                options.append(QueryPlan(tuple(sorted(subset)), bucket, est_ms, recall, rows,
+                                         reason='cheapest plan meeting recall target'))
+        feasible = [p for p in options if p.est_recall >= self.recall_target]
+        best = min(feasible, key=lambda p: p.est_ms)
+        if best.scan and len(feasible) > 1:
+            best.reason = 'scan is cheapest'
+        best.alternatives = [(p.label, p.est_ms, p.est_recall) for p in options if p is not best]
+        self.plan_counts[best.label] += 1
+        self.last = best
+        return best
+
+    def observe_path(self, name: str, ms: float):
+        self.path_ms[name] = self._ewma(self.path_ms.get(name), ms)
+
+    def observe_rows(self, ms: float, n_rows: int):
+        keep = 1 - self.alpha / 4
+        for i, v in enumerate((1.0, n_rows, ms, n_rows * n_rows, n_rows * ms)):
+            self._fit[i] = keep * self._fit[i] + v
+
+    def row_cost(self, n_rows: int) -> float:
+        """Predicted stage-2 ms for n_rows from the fixed + per-row fit."""
+        n, x, y, xx, xy = self._fit
+        if not n:
+            return 0.01 * n_rows
+        var = n * xx - x * x
+        slope = max((n * xy - x * y) / var, 0.0) if var > 1e-9 else y / max(x, 1.0)
+        fixed = max((y - slope * x) / n, 0.0)
+        return fixed + slope * n_rows
+
+    def observe_recall(self, bucket: tuple, truth: Set, found: Dict[str, Set]):
+        """Record, for every path subset, the share of the exact top-k it proposed."""
+        if not truth:
+            return
+        names = sorted(found)
+        stats = self.recall[bucket]
+        for r in range(1, len(names) + 1):
+            for subset in combinations(names, r):
+                covered = set().union(*(found[p] for p in subset))
+                recall = len(truth & covered) / len(truth)
+                old = stats.get(frozenset(subset))
+                if old is None:
+                    stats[frozenset(subset)] = [recall, 1]
+                else:
+                    old[0] = self._ewma(old[0], recall)
+                    old[1] += 1
+
+    def finish(self, actual_ms: float, actual_rows: int):
+        if self.last is not None:
+            self.last.actual_ms = actual_ms
+            self.last.actual_rows = actual_rows
+
+    def explain(self, plan: Optional[QueryPlan] = None) -> str:
+        plan = plan or self.last
+        if plan is None:
+            return 'no query planned yet'
+        distress, time_words, strong = plan.bucket
+        actual = 'n/a' if plan.actual_ms is None else f'{plan.actual_ms:.3f} ms'
+        lines = [
+            f'plan: {plan.label} ({plan.reason})',
+            f'  features: distress={distress} time_words={time_words} strong_vad={strong}',
+            f'  cost: est {plan.est_ms:.3f} ms, actual {actual}',
+            f'  rows: est {plan.est_rows}, actual {plan.actual_rows}',
+            f'  recall: est {plan.est_recall:.2f} (target {self.recall_target:.2f})',
+        ]
+        for label, est_ms, recall in sorted(plan.alternatives, key=lambda a: a[1])[:5]:
+            lines.append(f'  rejected {label}: est {est_ms:.3f} ms, recall {recall:.2f}')
+        return '\n'.join(lines)
+
+    def metrics(self) -> dict:
+        total = sum(self.plan_counts.values())
+        return {f'plan_{label}_share': n / total for label, n in self.plan_counts.items()} if total else {}
@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from src.memory.core import MemoryEntry, MemoryStore
+
+
+class RecencyRetriever:
+    """
+    The k newest memories straight from the store's insertion order, scored
+    by the same hourly decay WorkingMemory applies. O(k): no appraisal,
+    vectorization or scoring of older memories.
+    """
+
+    def __init__(self, store: MemoryStore, k: int = 3):
+        self.store = store
+        self.k = k
+
+    def retrieve(self, query: Optional[str] = None, query_vad=None) -> List[Tuple[MemoryEntry, float]]:
+        now = datetime.now()
+        out = []
+        for mem in self.store.get_recent(self.k):
+            age_hours = (now - mem.timestamp).total_seconds() / 3600
+            out.append((mem, max(0.1, 1.0 / (1 + age_hours))))
+        return out
@@ -0,0 +1,61 @@
+from typing import Dict, Hashable, List
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+
+class TfidfIndex:
+    """
+    Incremental TF-IDF over memory content. Each memory is hashed to a raw
+    term-count row once, on insert; document frequencies are kept as a
+    counter array updated on add/remove. IDF weights are applied at query time
+    to just the nonzero columns of the rows involved, so a query is one
+    sparse product over the requested rows and nothing is ever refitted.
+    Plugs into MemoryStore.subscribe() through on_add / on_remove.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, stop_words='english'):
+        self.hasher = HashingVectorizer(n_features=n_features, alternate_sign=False,
+                                        norm=None, stop_words=stop_words)
+        self.df = np.zeros(n_features, dtype=np.int64)
+        self.rows: Dict[Hashable, sparse.csr_matrix] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.rows
+
+    def add(self, key: Hashable, text: str):
+        if key in self.rows:
+            self.remove(key)
+        row = self.hasher.transform([text])
+        self.rows[key] = row
+        self.df[row.indices] += 1
+
+    def remove(self, key: Hashable):
+        row = self.rows.pop(key, None)
+        if row is not None:
+            self.df[row.indices] -= 1
+
+    def on_add(self, entry):
+        self.add(entry.id, entry.content)
+
+    def on_remove(self, entry):
+        self.remove(entry.id)
+
+    def _weight(self, m: sparse.csr_matrix) -> sparse.csr_matrix:
+        # Smoothed idf (as sklearn's TfidfTransformer) then row L2 norm
+        m = m.astype(float)
+        m.data *= np.log((1 + len(self.rows)) / (1 + self.df[m.indices])) + 1
+        norms = np.sqrt(np.asarray(m.multiply(m).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms) @ m
+
+    def scores(self, query: str, keys: List[Hashable]) -> np.ndarray:
+        """Cosine similarity between query and each indexed key."""
+        if not keys:
+            return np.zeros(0)
+        docs = self._weight(sparse.vstack([self.rows[k] for k in keys]).tocsr())
+        q = self._weight(self.hasher.transform([query]))
+        return np.asarray((docs @ q.T).todense()).ravel()
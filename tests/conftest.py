@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.agent.components import NeutralAppraiser  # noqa: E402
+from src.memory.core import EpisodicMemory, MemoryStore, WorkingMemory  # noqa: E402
+
+
+@pytest.fixture
+def appraiser():
+    """Lexicon-free appraiser: every turn gets the neutral VAD."""
+    return NeutralAppraiser()
+
+
+@pytest.fixture
+def memories(appraiser):
+    """(WorkingMemory, EpisodicMemory) on separate stores, the default wiring."""
+    return WorkingMemory(capacity=5, appraiser=appraiser), EpisodicMemory()
+
+
+@pytest.fixture
+def shared_memories(appraiser):
+    """(WorkingMemory, EpisodicMemory) on one shared store, as AMNAgent wires them."""
+    store = MemoryStore()
+    return WorkingMemory(capacity=5, store=store, appraiser=appraiser), EpisodicMemory(store=store)
@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.agent.agent import AMNAgent
+from src.agent.components import AgentComponents
+
+
+@pytest.fixture
+def agent():
+    return AMNAgent(model='test', components=AgentComponents(llm=lambda prompt, **kwargs: "I hear you."))
+
+
+def test_reset_session_clears_mood_keeps_memories(agent):
+    agent.step("I'm so anxious about the deadline at work")
+    agent.step("My boss yelled at me again today")
+    assert agent.mood.turns == 2
+    agent.reset_session()
+    assert agent.mood.turns == 0
+    assert len(agent.em) == 2
+
+
+def test_appraiser_built_once_across_threads():
+    components = AgentComponents(llm=lambda prompt, **kwargs: "")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        appraisers = list(pool.map(lambda _: components.appraiser, range(32)))
+    assert all(a is appraisers[0] for a in appraisers)
+
+
+def broken_stream(prompt, **kwargs):
+    yield "I hear "
+    raise ConnectionError("stream dropped")
+
+
+def test_stream_step_stores_only_completed_replies():
+    agent = AMNAgent(model='test', components=AgentComponents(
+        llm=lambda prompt, **kwargs: "", stream_llm=lambda prompt, **kwargs: iter(["I hear ", "you."])))
+    assert ''.join(agent.stream_step("Work is overwhelming")) == "I hear you."
+    assert len(agent.em) == 1
+    agent.components.stream_llm = broken_stream
+    with pytest.raises(ConnectionError):
+        list(agent.stream_step("And now my laptop died"))
+    stream = agent.stream_step("Never mind")
+    next(stream)
+    stream.close()
+    assert len(agent.em) == 1
+    assert agent.em.memories[0].content.endswith("Agent: I hear you.")
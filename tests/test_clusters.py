@@ -0,0 +1,13 @@
+import numpy as np
+
+from src.memory.clusters import OnlineClusters
+
+
+def test_search_round_robins_probed_clusters_newest_first():
+    clusters = OnlineClusters(dim=2, n_clusters=2)
+    for i in range(6):
+        clusters.add(f"a{i}", np.array([0.0, 0.0]))
+        clusters.add(f"b{i}", np.array([10.0, 10.0]))
+    assert clusters.search(np.array([1.0, 1.0]), n_probe=2, n=4) == ['a5', 'b5', 'a4', 'b4']
+    assert clusters.search(np.array([1.0, 1.0]), n_probe=1, n=3) == ['a5', 'a4', 'a3']
+    assert len(clusters.search(np.array([1.0, 1.0]), n_probe=2)) == 12
@@ -0,0 +1,28 @@
+from src.agent.llm_cache import LLMResponseCache
+
+
+def kwargs_llm(prompt, **kwargs):
+    return f"{kwargs.get('model')}:{kwargs.get('temperature')}"
+
+
+def test_kwargs_backend_keys_on_model_and_temperature(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / 'llm.sqlite'))
+    chat = cache.wrap(kwargs_llm, 'kw')
+    assert chat('hi', model='a', temperature=0.1) == 'a:0.1'
+    assert chat('hi', model='b', temperature=0.1) == 'b:0.1'
+    assert chat('hi', model='a', temperature=0.9) == 'a:0.9'
+    assert chat('hi', model='a', temperature=0.1) == 'a:0.1'
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_running_size_tracks_replace_and_eviction(tmp_path):
+    path = str(tmp_path / 'llm.sqlite')
+    cache = LLMResponseCache(path, max_bytes=10)
+    cache.put('a', 'xxxx')
+    cache.put('a', 'xxxxxx')
+    assert cache._bytes == 6
+    cache.put('b', 'yyyyyy')
+    assert cache._bytes == 6
+    assert cache.get('a') is None and cache.get('b') == 'yyyyyy'
+    cache.close()
+    assert LLMResponseCache(path, max_bytes=10)._bytes == 6
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from src.emotion.analyzer import VAD, FullEmotionalAppraisal
+from src.memory.core import EpisodicMemory, MemoryStore, WorkingMemory
+from src.retrieval.engine import RetrievalEngine
+from src.retrieval.graph import AssociativeGraph
+
+TURNS = [
+    "I'm terrified I'll miss the deadline and get fired",
+    "Dinner with my family last night was so joyful",
+    "My boss praised my project in front of everyone",
+    "I feel lonely every weekend since the move",
+    "Work stress keeps me awake at night",
+    "We laughed for hours at my sister's wedding",
+    "I'm angry that my promotion went to someone else",
+    "Walking the dog in the park calms me down",
+]
+
+QUERIES = [
+    ("the deadline at work is stressing me out", VAD(-0.5, 0.7, 0.3)),
+    ("family makes me happy", VAD(0.7, 0.4, 0.6)),
+    ("nobody calls me anymore", VAD(-0.6, 0.2, 0.2)),
+]
+
+
+@pytest.mark.parametrize('semantic', ['tfidf', 'bm25'])
+def test_batch_matches_single(semantic):
+    store = MemoryStore()
+    wm = WorkingMemory(capacity=3, store=store, appraiser=FullEmotionalAppraisal())
+    em = EpisodicMemory(store=store)
+    engine = RetrievalEngine(wm, em, k=3, cache_size=0, semantic=semantic)
+    for text in TURNS:
+        em.add(wm.add(text))
+    batch = engine.retrieve_batch([q for q, _ in QUERIES], [v for _, v in QUERIES])
+    for (query, vad), got in zip(QUERIES, batch):
+        single = engine.retrieve(query, vad)
+        assert [m.id for m, _ in got] == [m.id for m, _ in single]
+        # Recency decays by a hair between the two calls
+        np.testing.assert_allclose([s for _, s in got], [s for _, s in single], rtol=1e-6)
+
+
+def test_multi_matches_single_with_graph():
+    store = MemoryStore()
+    wm = WorkingMemory(capacity=3, store=store, appraiser=FullEmotionalAppraisal())
+    em = EpisodicMemory(store=store)
+    engine = RetrievalEngine(wm, em, k=3, cache_size=0, graph=AssociativeGraph(), spread_weight=0.5)
+    for text in TURNS:
+        em.add(wm.add(text))
+    configs = {
+        'full': dict(engine.weights),
+        'semantic_only': {'semantic': 1.0},
+        'emotional_only': {'emotional': 1.0},
+    }
+    for query, vad in QUERIES:
+        ranked = engine.retrieve_multi(query, vad, configs)
+        for name, weights in configs.items():
+            engine.weights = weights
+            single = engine.retrieve(query, vad)
+            assert [m.id for m, _ in ranked[name]] == [m.id for m, _ in single]
+            np.testing.assert_allclose([s for _, s in ranked[name]], [s for _, s in single], rtol=1e-6)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from src.emotion.analyzer import VAD, lazarus_from_vad
+from src.retrieval.cache import RetrievalCache
+from src.retrieval.engine import RetrievalEngine, RetrievalRequest
+
+
+def make_engine(shared_memories, n=12):
+    wm, em = shared_memories
+    engine = RetrievalEngine(wm, em, k=3)
+    for i in range(n):
+        em.add(wm.add(f"turn {i}: work has been stressful, deadline number {i}"))
+    return engine
+
+
+def test_repeated_request_hits(shared_memories):
+    engine = make_engine(shared_memories)
+    vad = VAD(-0.4, 0.6, 0.3)
+    first = engine.retrieve("work deadline", vad)
+    assert engine.retrieve("work deadline", vad) == first
+    assert (engine.cache.hits, engine.cache.misses) == (1, 1)
+
+
+def test_key_depends_on_appraisal(shared_memories):
+    engine = make_engine(shared_memories)
+    vad = VAD(-0.4, 0.6, 0.3)
+    base = lazarus_from_vad(vad)
+    engine.retrieve(RetrievalRequest("work deadline", vad, appraisal=base))
+    engine.retrieve(RetrievalRequest("work deadline", vad, appraisal=base._replace(goal_relevance=0.99)))
+    assert (engine.cache.hits, engine.cache.misses) == (0, 2)
+
+
+def test_key_depends_on_query_vec():
+    vad = VAD(0.0, 0.5, 0.5)
+    a = RetrievalCache.make_key("q", vad, {}, 3, 0, query_vec=np.ones(4))
+    b = RetrievalCache.make_key("q", vad, {}, 3, 0, query_vec=np.zeros(4))
+    assert a != b
+    assert a == RetrievalCache.make_key("q", vad, {}, 3, 0, query_vec=np.ones(4, dtype=np.float64))
+    assert a != RetrievalCache.make_key("q", vad, {}, 3, 0)
+
+
+def test_store_write_invalidates(shared_memories):
+    engine = make_engine(shared_memories)
+    wm, em = shared_memories
+    vad = VAD(-0.4, 0.6, 0.3)
+    engine.retrieve("work deadline", vad)
+    em.add(wm.add("a new deadline at work"))
+    engine.retrieve("work deadline", vad)
+    assert engine.cache.hits == 0
+
+
+def test_stage_latency_is_running_totals(shared_memories):
+    engine = make_engine(shared_memories)
+    for i in range(5):
+        engine.retrieve(f"work deadline {i}", VAD(-0.4, 0.6, 0.3))
+    total, n = engine.stage_latency_ms['stage2']
+    assert n == 5 and engine.metrics()['stage2_ms_mean'] == pytest.approx(total / n)
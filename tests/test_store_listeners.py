@@ -0,0 +1,84 @@
+from src.memory.core import EPISODIC, WORKING, MemoryStore, RefCountedListener, WorkingMemory
+from src.retrieval.engine import RetrievalEngine
+from src.retrieval.graph import AssociativeGraph
+
+
+class Recorder:
+    def __init__(self):
+        self.added = []
+        self.removed = []
+
+    def on_add(self, entry):
+        self.added.append(entry.id)
+
+    def on_remove(self, entry):
+        self.removed.append(entry.id)
+
+
+def fill(wm, em, n):
+    return [em.add(wm.add(f"turn {i}: my sister called about the wedding budget {i}")) for i in range(n)]
+
+
+def test_index_keeps_entries_evicted_from_working_memory(memories):
+    wm, em = memories
+    engine = RetrievalEngine(wm, em, k=3, cache_size=0)
+    entries = fill(wm, em, 11)
+    assert len(wm.memories) == 5
+    assert len(engine.bm25) == 11
+    hits = {key for key, _ in engine.bm25.top_n("sister wedding budget", 20)}
+    assert entries[0].id in hits
+
+
+def test_graph_keeps_nodes_evicted_from_working_memory(memories):
+    wm, em = memories
+    graph = AssociativeGraph()
+    RetrievalEngine(wm, em, k=3, cache_size=0, graph=graph)
+    entries = fill(wm, em, 11)
+    assert len(graph) == 11
+    assert entries[0].id in graph.edges
+
+
+def test_shared_graph_subscribed_once(memories):
+    wm, em = memories
+    graph = AssociativeGraph()
+    RetrievalEngine(wm, em, cache_size=0, graph=graph)
+    RetrievalEngine(wm, em, cache_size=0, graph=graph)
+    for store in (wm.store, em.store):
+        assert sum(getattr(l, 'listener', l) is graph for l in store.listeners) == 1
+
+
+def test_drop_tier_notifies_only_when_entry_leaves_every_tier(shared_memories):
+    wm, _ = shared_memories
+    store = wm.store
+    recorder = Recorder()
+    store.subscribe(recorder)
+    entry = wm.add("hello")
+    store.put(entry, EPISODIC)
+    assert recorder.added == [entry.id]
+    store.drop_tier(entry, WORKING)
+    assert recorder.removed == [] and entry in store
+    store.drop_tier(entry, EPISODIC)
+    assert recorder.removed == [entry.id] and entry not in store
+
+
+def test_subscribe_backfills_live_entries(shared_memories):
+    wm, _ = shared_memories
+    first = wm.add("one")
+    recorder = Recorder()
+    wm.store.subscribe(recorder)
+    assert recorder.added == [first.id]
+
+
+def test_ref_counted_listener_across_stores(appraiser):
+    a, b = MemoryStore(), MemoryStore()
+    recorder = Recorder()
+    shared = RefCountedListener(recorder)
+    a.subscribe(shared)
+    b.subscribe(shared)
+    entry = WorkingMemory(store=a, appraiser=appraiser).add("hi")
+    b.put(entry, EPISODIC)
+    assert recorder.added == [entry.id]
+    a.drop_tier(entry, WORKING)
+    assert recorder.removed == []
+    b.drop_tier(entry, EPISODIC)
+    assert recorder.removed == [entry.id]